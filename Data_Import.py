@@ -1,22 +1,159 @@
-import yfinance as yf
-# Example for Trent Ltd (NSE)
-data = yf.download("TRENT.NS", start="2015-01-01", end="2025-12-31")
-data.to_csv("trent_stock_10yrs.csv")
-data_abfrl = yf.download("ABFRL.NS", start="2015-01-01", end="2025-12-31")
-data_abfrl.to_csv("ABFRL_stock_10yrs.csv")
-
-# 2. Avenue Supermarts Ltd. (DMart)
-data_dmart = yf.download("DMART.NS", start="2015-01-01", end="2025-12-31")
-data_dmart.to_csv("DMART_stock_10yrs.csv")
-
-# 3. Shoppers Stop Ltd.
-data_shoppers = yf.download("SHOPERSTOP.NS", start="2015-01-01", end="2025-12-31")
-data_shoppers.to_csv("Shoppers_Stop_stock_10yrs.csv")
-
-# 4. Spencer'S Retail Ltd.
-data_spencers = yf.download("SPENCERS.NS", start="2015-01-01", end="2025-12-31")
-data_spencers.to_csv("Spencers_Retail_stock_10yrs.csv")
-
-# 5. V-Mart Retail Ltd.
-data_vmart = yf.download("VMART.NS", start="2015-01-01", end="2025-12-31")
-data_vmart.to_csv("VMART_stock_10yrs.csv")
\ No newline at end of file
+"""
+Bulk price ingestion into the local OHLCV store (store.py).
+
+    python Data_Import.py                      # every comp_map ticker + legacy universe
+    python Data_Import.py DMART.NS TITAN.NS --workers 2 --retries 5
+    python Data_Import.py --source dir:fixtures     # <SYMBOL>_stock_10yrs.csv or <TICKER>.csv files
+    python Data_Import.py --source http://127.0.0.1:8000   # GET <url>/<TICKER>.csv
+
+Tickers are downloaded with bounded concurrency and retries, validated and
+normalized to Date/Open/High/Low/Close/Volume, and only then committed to
+the store (each ticker written atomically). Nothing is committed unless
+every ticker succeeded; --allow-partial commits the ones that did.
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import companies
+import store
+
+# Tickers the original one-off script exported alongside the sidebar universe
+LEGACY_TICKERS = ["TRENT.NS", "ABFRL.NS", "DMART.NS", "SHOPERSTOP.NS", "SPENCERS.NS", "VMART.NS"]
+
+def default_universe():
+    return list(dict.fromkeys(companies.tickers() + LEGACY_TICKERS))
+
+class YahooBackend:
+    def fetch(self, ticker, start, end):
+        import yfinance as yf
+        return yf.download(ticker, start=start, end=end, progress=False, auto_adjust=True, threads=False)
+
+class DirectoryBackend:
+    """Reads yf.download dumps from a folder: <TICKER>.csv or <SYMBOL>_stock_10yrs.csv."""
+    def __init__(self, folder):
+        self.folder = folder
+
+    def fetch(self, ticker, start, end):
+        for name in (f"{ticker}.csv", f"{ticker.split('.')[0]}_stock_10yrs.csv"):
+            path = os.path.join(self.folder, name)
+            if os.path.exists(path):
+                with open(path, 'rb') as f: return _read_dump(f.read())
+        raise FileNotFoundError(f"no fixture for {ticker} in {self.folder}")
+
+class HTTPBackend:
+    """GETs <base_url>/<TICKER>.csv in yf.download dump format, e.g. from a local fixture server."""
+    def __init__(self, base_url, timeout=10):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def fetch(self, ticker, start, end):
+        with urllib.request.urlopen(f"{self.base_url}/{ticker}.csv", timeout=self.timeout) as resp:
+            return _read_dump(resp.read())
+
+def _read_dump(raw):
+    """Parses the Price/Ticker/Date three-line header of a yf.download CSV into the same shape yf.download returns."""
+    return pd.read_csv(io.BytesIO(raw), header=[0, 1], index_col=0, skiprows=[2])
+
+def backend_from_spec(spec):
+    if spec == "yahoo": return YahooBackend()
+    if spec.startswith("dir:"): return DirectoryBackend(spec[4:])
+    if spec.startswith(("http://", "https://")): return HTTPBackend(spec)
+    raise ValueError(f"unknown source {spec!r}")
+
+def normalize(raw, ticker, start=None, end=None):
+    """
+    yf.download output (flat or (Price, Ticker) multi-level columns, Date
+    index) -> validated Date/Open/High/Low/Close/Volume frame. Raises
+    ValueError when the payload is unusable.
+    """
+    if raw is None or raw.empty: raise ValueError("empty download")
+    df = raw.copy()
+    if isinstance(df.columns, pd.MultiIndex):
+        tickers = df.columns.get_level_values(1)
+        if ticker in set(tickers): df = df.loc[:, tickers == ticker]
+        df.columns = df.columns.get_level_values(0)
+    missing = [c for c in store.COLUMNS if c not in df.columns]
+    if missing: raise ValueError(f"missing columns {missing}")
+
+    df = df[store.COLUMNS].apply(pd.to_numeric, errors='coerce')
+    df.index = pd.to_datetime(df.index, errors='coerce')
+    if getattr(df.index, 'tz', None) is not None: df.index = df.index.tz_localize(None)
+    df = df[df.index.notna() & df['Close'].notna()]
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    if start: df = df[df.index >= pd.Timestamp(start)]
+    if end: df = df[df.index <= pd.Timestamp(end)]
+    if df.empty: raise ValueError("no valid bars")
+    if (df['Close'] <= 0).any(): raise ValueError("non-positive close")
+    if (df['High'] < df['Low']).any(): raise ValueError("high below low")
+    df.index.name = 'Date'
+    return df.reset_index()
+
+def fetch_one(backend, ticker, start, end, retries, backoff):
+    t0 = time.perf_counter()
+    error = None
+    for attempt in range(1, retries + 1):
+        try:
+            frame = normalize(backend.fetch(ticker, start, end), ticker, start, end)
+            return {"ticker": ticker, "frame": frame, "attempts": attempt, "error": None, "seconds": time.perf_counter() - t0}
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            if attempt < retries: time.sleep(backoff * 2 ** (attempt - 1))
+    return {"ticker": ticker, "frame": None, "attempts": retries, "error": error, "seconds": time.perf_counter() - t0}
+
+def ingest(tickers, backend, start="2015-01-01", end=None, workers=4, retries=3, backoff=1.0, allow_partial=False):
+    """
+    Downloads and validates every ticker, then commits them to the store:
+    all of them, or none if any failed (unless allow_partial). Returns the
+    per-ticker report.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        results = list(pool.map(lambda t: fetch_one(backend, t, start, end, retries, backoff), tickers))
+
+    ok = all(r["error"] is None for r in results)
+    for r in results:
+        r["rows"] = 0 if r["frame"] is None else len(r["frame"])
+        r["committed"] = False
+        if r["frame"] is not None and (ok or allow_partial):
+            store.merge(r["ticker"], r["frame"])
+            r["committed"] = True
+        r.pop("frame")
+    manifest = {}
+    for r in results:
+        manifest[r["ticker"]] = {k: r[k] for k in ("rows", "attempts", "error", "committed")}
+        if r["committed"]: manifest[r["ticker"]]["ingested_at"] = time.time()
+    store.update_manifest(manifest)
+    return results
+
+def print_report(results):
+    print(f"{'TICKER':<16}{'STATUS':<10}{'ROWS':>7}{'TRIES':>7}{'SECONDS':>10}")
+    for r in results:
+        status = "ok" if r["committed"] else ("skipped" if r["error"] is None else "failed")
+        print(f"{r['ticker']:<16}{status:<10}{r['rows']:>7}{r['attempts']:>7}{r['seconds']:>10.2f}")
+        if r["error"]: print(f"  {r['error']}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("tickers", nargs="*", help="defaults to every comp_map ticker plus the legacy universe")
+    parser.add_argument("--source", default="yahoo", help="yahoo | dir:<folder> | http://host:port")
+    parser.add_argument("--start", default="2015-01-01")
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=1.0, help="seconds before the first retry, doubled each time")
+    parser.add_argument("--allow-partial", action="store_true", help="commit the tickers that succeeded even if others failed")
+    args = parser.parse_args(argv)
+
+    results = ingest(args.tickers or default_universe(), backend_from_spec(args.source), args.start, args.end,
+                     args.workers, args.retries, args.backoff, args.allow_partial)
+    print_report(results)
+    return 0 if all(r["error"] is None for r in results) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""
+Walk-forward backtesting.
+
+Every origin t is scored one step ahead: fit on rows before t (all of them
+for an expanding window, the last train_size for a rolling one), predict
+row t. Neighbouring origins share work instead of refitting from scratch:
+
+* Ridge keeps centered sufficient statistics (means, X'X and X'y
+  co-moments) and updates them with one rank-one update per new row (and a
+  downdate per dropped row when rolling), so each origin is an exact Ridge
+  fit for the cost of a p x p solve.
+* Tree models are refit every refit_every origins and reused in between;
+  GradientBoosting continues from the previous fit with warm_start, adding
+  warm_trees stages on the longer history instead of starting over.
+
+Origins are split into blocks of block_size (one refit cycle, refit_every
+origins, by default) that are independent of each other and run in
+parallel over n_jobs workers. Block boundaries do not depend on n_jobs, so
+the result is the same for any worker count. Blocks start on a refit, so
+Ridge and forests score exactly as one long block would; GradientBoosting
+starts each block from a fresh fit instead of warm-starting across blocks.
+"""
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.ensemble import GradientBoostingRegressor
+from sklearn.linear_model import Ridge
+
+MIN_TRAIN = 50
+
+class RidgeStats:
+    """Centered running statistics for an exact incremental Ridge(alpha) fit with intercept."""
+    def __init__(self, X, y, alpha):
+        self.alpha = alpha
+        self.n = len(X)
+        self.mx = X.mean(axis=0)
+        self.my = y.mean()
+        Xc = X - self.mx
+        self.cxx = Xc.T @ Xc
+        self.cxy = Xc.T @ (y - self.my)
+
+    def add(self, x, y):
+        self.n += 1
+        dx = x - self.mx
+        self.mx = self.mx + dx / self.n
+        self.my += (y - self.my) / self.n
+        self.cxx += np.outer(dx, x - self.mx)
+        self.cxy += dx * (y - self.my)
+
+    def remove(self, x, y):
+        mx_old, my_old = self.mx, self.my
+        self.n -= 1
+        self.mx = mx_old - (x - mx_old) / self.n
+        self.my = my_old - (y - my_old) / self.n
+        self.cxx -= np.outer(x - self.mx, x - mx_old)
+        self.cxy -= (x - self.mx) * (y - my_old)
+
+    def coef(self):
+        p = len(self.mx)
+        w = np.linalg.solve(self.cxx + self.alpha * np.eye(p), self.cxy)
+        return w, self.my - self.mx @ w
+
+def _train_start(t, window, train_size):
+    return 0 if window == "expanding" else max(0, t - train_size)
+
+def _ridge_block(model, X, y, origins, window, train_size):
+    t0 = origins[0]
+    lo = _train_start(t0, window, train_size)
+    stats = RidgeStats(X[lo:t0], y[lo:t0], model.alpha)
+    end = t0
+    preds = []
+    for t in origins:
+        for i in range(end, t): stats.add(X[i], y[i])
+        end = t
+        new_lo = _train_start(t, window, train_size)
+        for i in range(lo, new_lo): stats.remove(X[i], y[i])
+        lo = new_lo
+        w, b = stats.coef()
+        preds.append(X[t] @ w + b)
+    return preds
+
+def _tree_block(model, X, y, origins, window, train_size, refit_every, warm_trees):
+    boosting = isinstance(model, GradientBoostingRegressor)
+    preds = []
+    fitted = None
+    for k, t in enumerate(origins):
+        if k % refit_every == 0:
+            lo = _train_start(t, window, train_size)
+            if fitted is None or not boosting:
+                fitted = clone(model)
+                if boosting: fitted.set_params(warm_start=True)
+            else:
+                fitted.set_params(n_estimators=fitted.n_estimators + warm_trees)
+            fitted.fit(X[lo:t], y[lo:t])
+        preds.append(fitted.predict(X[t:t + 1])[0])
+    return preds
+
+def _run_block(model, X, y, origins, window, train_size, refit_every, warm_trees):
+    if isinstance(model, Ridge): return _ridge_block(model, X, y, origins, window, train_size)
+    return _tree_block(model, X, y, origins, window, train_size, refit_every, warm_trees)
+
+def walk_forward(model, X, y, dates=None, origins=250, window="expanding", train_size=500,
+                 refit_every=10, warm_trees=10, block_size=None, n_jobs=1, backend="loky"):
+    """
+    One-step-ahead walk-forward evaluation of an (unfitted) sklearn model
+    over the last `origins` rows of X/y.
+
+    Returns {"predictions": DataFrame(Date, Actual, Predicted) indexed by row,
+    "RMSE", "MAE", "MAPE", "Origins"}.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(X)
+    first = max(n - origins, MIN_TRAIN if window == "expanding" else max(MIN_TRAIN, train_size))
+    points = list(range(first, n))
+    if not points:
+        return {"predictions": pd.DataFrame(columns=["Date", "Actual", "Predicted"]), "RMSE": np.nan, "MAE": np.nan, "MAPE": np.nan, "Origins": 0}
+
+    block_size = block_size or refit_every
+    blocks = [points[i:i + block_size] for i in range(0, len(points), block_size)]
+    args = (window, train_size, refit_every, warm_trees)
+    if n_jobs == 1: results = [_run_block(model, X, y, b, *args) for b in blocks]
+    else: results = Parallel(n_jobs=n_jobs, backend=backend)(delayed(_run_block)(model, X, y, b, *args) for b in blocks)
+
+    pred = np.concatenate(results)
+    actual = y[points]
+    err = pred - actual
+    out = pd.DataFrame({
+        "Date": None if dates is None else np.asarray(dates)[points],
+        "Actual": actual, "Predicted": pred
+    }, index=points)
+    return {
+        "predictions": out,
+        "RMSE": float(np.sqrt(np.mean(err ** 2))),
+        "MAE": float(np.mean(np.abs(err))),
+        "MAPE": float(np.mean(np.abs(err / actual)) * 100),
+        "Origins": len(points)
+    }
@@ -0,0 +1,660 @@
+"""
+Offline benchmarks for the analytics pipeline.
+
+    python benchmark.py [name ...]        # ad-hoc comparisons (no names = all)
+    python benchmark.py --suite [--quick] # regression suite vs benchmark_baseline.json
+    python benchmark.py --suite --save-baseline
+
+The suite runs against the bundled CSVs plus synthetic random-walk series of
+10k-1M bars and records latency percentiles, throughput and peak traced
+memory per case. A case is flagged when its p50 latency or peak memory grows
+by more than --tolerance over the stored baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import financials
+import backtest
+import comparison
+import indicators
+import instrument
+import market
+import marketdata
+import online
+import prediction
+import sector
+import store
+import stream
+import tuning
+import verdict
+
+COMPANIES = ["Avenue Supermarts Ltd.", "Titan Company Ltd.", "Kalyan Jewellers India Ltd.",
+             "Metro Brands Ltd.", "Ethos Ltd.", "Arvind Fashions Ltd."]
+
+def load_price_csv(path="DMART_stock_10yrs.csv"):
+    return store.read_price_csv(path)
+
+def _timeit(fn, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def _report(label, seconds):
+    print(f"  {label:<40} {seconds * 1000:10.3f} ms")
+
+def bench_statements():
+    """Cold CSV parse vs warm disk (.npz) vs warm in-process LRU hit."""
+    def cold():
+        financials.clear_statement_cache(disk=True)
+        for c in COMPANIES: financials.load_local_data(c)
+    def warm_disk():
+        financials.STATEMENT_CACHE.clear()
+        for c in COMPANIES: financials.load_local_data(c)
+    def warm_memory():
+        for c in COMPANIES: financials.load_local_data(c)
+
+    print("load_local_data x6 companies")
+    _report("cold parse", _timeit(cold))
+    _report("warm disk hit", _timeit(warm_disk))
+    _report("warm memory hit", _timeit(warm_memory))
+    stmts = [s for c in COMPANIES for s in financials.load_local_data(c).values() if not s.empty]
+    columnar = sum(s.values.nbytes + s.metric_ids.nbytes + s.years.nbytes for s in stmts)
+    labelled = sum(int(s.frame().memory_usage(deep=True, index=True).sum()) for s in stmts)
+    print(f"  {'statements in memory':<40} {columnar / 1e3:10.1f} kB columnar, {labelled / 1e3:.1f} kB as labelled DataFrames")
+
+def bench_registry():
+    """Full ensemble training vs a registry hit that only reruns the forecast loop."""
+    df = load_price_csv()
+    def cold():
+        prediction.MODEL_REGISTRY.clear()
+        prediction.run_ensemble_forecast(df, 14)
+    def warm_disk():
+        prediction.MODEL_REGISTRY.clear()
+        prediction.run_ensemble_forecast(df, 14, ticker="DMART.NS")
+    def warm_memory():
+        prediction.run_ensemble_forecast(df, 14, ticker="DMART.NS")
+
+    print("run_ensemble_forecast (DMART, 14 days)")
+    _report("train (no registry)", _timeit(cold, repeat=1))
+    prediction.run_ensemble_forecast(df, 14, ticker="DMART.NS")
+    _report("registry disk hit", _timeit(warm_disk))
+    _report("registry memory hit", _timeit(warm_memory))
+
+def bench_parallel():
+    """Serial vs joblib-parallel ensemble training; also checks the outputs match (costs are timings, so only accuracy is compared)."""
+    data = prediction.prepare_features(load_price_csv())
+    workers = max(2, os.cpu_count() or 1)
+    results = {}
+    def run(n_jobs):
+        results[n_jobs] = prediction.train_ensemble(data, n_jobs=n_jobs)
+
+    print(f"train_ensemble (DMART, {os.cpu_count()} cores)")
+    _report("serial (n_jobs=1)", _timeit(lambda: run(1), repeat=1))
+    _report(f"parallel (n_jobs={workers})", _timeit(lambda: run(workers), repeat=1))
+    a, b = results[1], results[workers]
+    accuracy = a["perf_df"].columns.difference(prediction.COST_COLS)
+    same = a["name"] == b["name"] and a["perf_df"][accuracy].equals(b["perf_df"][accuracy]) and a["reality_check"] == b["reality_check"]
+    print(f"  identical results: {same}")
+
+def _legacy_forecast(model, last_row, days):
+    """The pre-RecursiveForecaster loop: one pandas row and one predict call per day."""
+    curr = dict(last_row)
+    curr['Lag_2'], curr['Lag_1'] = curr['Lag_1'], curr['Close']
+    out = []
+    for _ in range(days):
+        curr['Date'] += pd.Timedelta(days=1)
+        feat = pd.DataFrame([{c: curr[c] for c in prediction.FEATURE_COLS if c != 'Date_Ord'} | {'Date_Ord': curr['Date'].toordinal()}])
+        pred = model.predict(feat[prediction.FEATURE_COLS].to_numpy())[0]
+        out.append(pred)
+        curr['Lag_5'], curr['Lag_2'], curr['Lag_1'] = curr['Lag_2'], curr['Lag_1'], pred
+        curr['MA_5'] = (curr['MA_5'] * 4 + pred) / 5
+    return out
+
+def bench_forecaster():
+    """Per-step cost of the recursive forecast: legacy loop vs RecursiveForecaster, single and batched."""
+    data = prediction.prepare_features(load_price_csv())
+    last_row = data.iloc[-1][['Date', 'Close'] + prediction.FEATURE_COLS].to_dict()
+    X, y = data[prediction.FEATURE_COLS], data['Close']
+    days, scenarios = 365, 64
+    print(f"recursive forecast ({days} days)")
+    for name in prediction.MODEL_SPECS:
+        model = prediction._fit_final(name, X, y)
+        forecaster = prediction.RecursiveForecaster(model)
+        state = prediction.state_vector(last_row)
+        batch = np.repeat(state[None, :], scenarios, axis=0)
+        legacy = _timeit(lambda: _legacy_forecast(model, last_row, days), repeat=1)
+        single = _timeit(lambda: forecaster.forecast(state, days), repeat=3)
+        batched = _timeit(lambda: forecaster.forecast(batch, days), repeat=1)
+        print(f"  {name}")
+        print(f"    {'legacy per step':<38} {legacy / days * 1e6:10.1f} us")
+        print(f"    {'forecaster per step':<38} {single / days * 1e6:10.1f} us")
+        print(f"    {f'forecaster per step x{scenarios} scenarios':<38} {batched / days / scenarios * 1e6:10.1f} us/scenario")
+
+def bench_indicators():
+    """Cost of absorbing one new bar: batch recompute over the full history vs IndicatorEngine.append."""
+    df = load_price_csv()
+    new_bars = df.tail(50).to_dict('records')
+    engine, _ = indicators.IndicatorEngine.from_history(df.iloc[:-50])
+    batch = _timeit(lambda: market.add_technical_indicators(df), repeat=5)
+    t0 = time.perf_counter()
+    for bar in new_bars: engine.append(bar)
+    incremental = (time.perf_counter() - t0) / len(new_bars)
+    print(f"technical indicators per new bar ({len(df)} bars of history)")
+    _report("batch add_technical_indicators", batch)
+    _report("IndicatorEngine.append", incremental)
+
+def bench_store():
+    """Price history: parsing the CSV dump vs reading the memory-mapped store."""
+    ticker = "DMART.NS"
+    store.seed(ticker)
+    print("price history (DMART)")
+    _report("read_price_csv", _timeit(lambda: load_price_csv()))
+    _report("store.window (zero-copy)", _timeit(lambda: store.window(ticker)))
+    _report("store.history (no sync)", _timeit(lambda: store.history(ticker, sync_now=False)))
+
+def bench_sector():
+    """Comparing the universe: per-company page computations x6 vs one SectorCube pass."""
+    def per_company():
+        for c in COMPANIES:
+            d = financials.load_local_data(c)
+            financials.get_trend_data_local(d)
+            financials.get_balance_sheet_trend(d)
+            financials.get_ratios_latest(d)
+            financials.calculate_growth_metrics(d)
+    def cube():
+        sector.SectorCube.load().summary()
+    cube()
+    print("sector comparison (6 companies, warm statement cache)")
+    _report("per-company functions", _timeit(per_company))
+    _report("SectorCube.load + summary", _timeit(cube))
+    c = sector.SectorCube.load()
+    _report("summary on a loaded cube", _timeit(c.summary))
+
+def _legacy_latest(df, keywords):
+    """The pre-MetricIndex lookup: lower-case every label, then walk the row backwards."""
+    for idx in df.index:
+        if any(k.lower() in str(idx).lower() for k in keywords):
+            for val in df.loc[idx].values[::-1]:
+                if pd.notna(val) and val != 0: return val
+    return 0.0
+
+def bench_metric_lookup():
+    """One metric lookup: linear label scan vs the memoized MetricIndex."""
+    datasets = financials.load_local_data("Titan Company Ltd.")
+    queries = [(datasets["Ratios"], kw) for kw in financials.RATIO_TARGETS.values()]
+    queries += [(datasets["BS"], ["Current Assets", "Total Current Assets"]), (datasets["BS"], ["Current Liabilities", "Total Current Liabilities"])]
+    n = 200
+    frames = [(stmt.frame(), kw) for stmt, kw in queries]
+    def legacy():
+        for _ in range(n):
+            for df, kw in frames: _legacy_latest(df, kw)
+    def indexed():
+        for _ in range(n):
+            for df, kw in queries: financials.get_latest_value(df, kw)
+    per = n * len(queries)
+    print("get_latest_value (Titan ratios + balance sheet)")
+    print(f"  {'linear scan per lookup':<40} {_timeit(legacy, repeat=3) / per * 1e6:10.1f} us")
+    print(f"  {'MetricIndex per lookup':<40} {_timeit(indexed, repeat=3) / per * 1e6:10.1f} us")
+    _report("trend + growth functions (warm index)", _timeit(lambda: (financials.get_trend_data_local(datasets), financials.get_balance_sheet_trend(datasets), financials.calculate_growth_metrics(datasets))))
+
+def bench_walk_forward():
+    """Walk-forward backtest: a from-scratch Ridge refit per origin vs the incremental engine."""
+    data = prediction.prepare_features(load_price_csv())
+    X = data[prediction.FEATURE_COLS].to_numpy(dtype=np.float64)
+    y = data['Close'].to_numpy()
+    origins = 250
+    ridge_cls, ridge_params = prediction.BACKTEST_SPECS["Ridge Regression"]
+    def naive():
+        for t in range(len(X) - origins, len(X)):
+            ridge_cls(**ridge_params).fit(X[:t], y[:t]).predict(X[t:t + 1])
+    print(f"walk-forward backtest ({origins} origins)")
+    _report("Ridge, full refit per origin", _timeit(naive, repeat=1))
+    _report("Ridge, rank-one updates", _timeit(lambda: backtest.walk_forward(ridge_cls(**ridge_params), X, y, origins=origins)))
+    gb_cls, gb_params = prediction.BACKTEST_SPECS["Gradient Boosting"]
+    _report("Gradient Boosting, refit every 60", _timeit(lambda: backtest.walk_forward(gb_cls(**gb_params), X, y, origins=origins, refit_every=60), repeat=1))
+
+def _peak(fn):
+    """(seconds, peak traced bytes) for one call."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+def _synthetic_bars(n, seed=0):
+    """n daily random-walk bars from 1700-01-01 in store layout (n is capped by the datetime64[ns] range)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    days = np.arange(n, dtype=np.float64) + (np.datetime64('1700-01-01', 'D') - np.datetime64('1970-01-01', 'D')).astype(np.int64)
+    return np.column_stack([days, close, close * 1.01, close * 0.99, close, rng.integers(1000, 10000, n).astype(np.float64)])
+
+def bench_memory():
+    """Peak memory of in-sample scoring: full DataFrame path vs stream.predict in 4096-bar blocks."""
+    data = prediction.prepare_features(load_price_csv())
+    model = prediction._fit_final("Ridge Regression", data[prediction.FEATURE_COLS], data['Close'])
+    def full(ticker):
+        frame = prediction.prepare_features(store.history(ticker, sync_now=False))
+        return model.predict(frame[prediction.FEATURE_COLS].to_numpy(dtype=np.float64))
+
+    old_dir = store.STORE_DIR
+    store.STORE_DIR = tempfile.mkdtemp(prefix="rsa-bench-")
+    try:
+        store.write("DMART.NS", store.to_matrix(load_price_csv()))
+        store.write("SYNTH.NS", _synthetic_bars(200_000))
+        print("in-sample scoring, peak traced memory")
+        for ticker in ("DMART.NS", "SYNTH.NS"):
+            print(f"  {ticker} ({len(store.read(ticker))} bars)")
+            for label, fn in (("full DataFrame path", lambda: full(ticker)), ("stream.predict", lambda: stream.predict(model, ticker))):
+                seconds, peak = _peak(fn)
+                print(f"    {label:<38} {peak / 2 ** 20:8.1f} MiB {seconds * 1000:10.1f} ms")
+    finally:
+        shutil.rmtree(store.STORE_DIR, ignore_errors=True)
+        store.STORE_DIR = old_dir
+
+def bench_instrument():
+    """Per-call cost of @instrument.timed, disabled and enabled, on a trivial function."""
+    def raw(x): return x
+    wrapped = instrument.timed("bench.noop", rows=None)(raw)
+    n = 200_000
+    def loop(fn):
+        for i in range(n): fn(i)
+    was = instrument.ENABLED
+    try:
+        instrument.enable(False)
+        disabled = _timeit(lambda: loop(wrapped), repeat=3)
+        instrument.enable(True)
+        enabled = _timeit(lambda: loop(wrapped), repeat=3)
+    finally:
+        instrument.enable(was)
+    base = _timeit(lambda: loop(raw), repeat=3)
+    print("instrumentation overhead per call")
+    print(f"  {'disabled':<40} {(disabled - base) / n * 1e9:10.0f} ns")
+    print(f"  {'enabled':<40} {(enabled - base) / n * 1e9:10.0f} ns")
+
+def bench_batch():
+    """Six tickers: one run_ensemble_forecast call each vs prediction.forecast_batch."""
+    histories = {"DMART.NS": load_price_csv(), **{f"SYN{i}.NS": synthetic_prices(2000, i) for i in range(1, 6)}}
+    workers = max(2, os.cpu_count() or 1)
+    print(f"forecast for {len(histories)} tickers ({os.cpu_count()} cores, no registry)")
+    _report("prepare_features per ticker", _timeit(lambda: [prediction.prepare_features(df) for df in histories.values()]))
+    _report("prepare_features_batch", _timeit(lambda: prediction.prepare_features_batch(histories)))
+    _report("run_ensemble_forecast per ticker", _timeit(lambda: [prediction.run_ensemble_forecast(df, 30) for df in histories.values()], repeat=1))
+    _report(f"forecast_batch (n_jobs={workers})", _timeit(lambda: prediction.forecast_batch(histories, 30, n_jobs=workers, use_registry=False), repeat=1))
+
+def bench_backends():
+    """Every model backend on DMART's 90/10 split: accuracy next to fit time, predict latency and pickled size."""
+    data = prediction.prepare_features(load_price_csv())
+    X, y = data[prediction.FEATURE_COLS], data['Close']
+    split = int(len(data) * 0.9)
+    specs = {name: spec for name, (spec, _) in prediction.MODEL_BACKENDS.items()}
+    fitted = [prediction._fit_candidate(name, X.iloc[:split], y.iloc[:split], X.iloc[split:], y.iloc[split:], specs) for name in specs]
+    perf = pd.DataFrame([row for _, row in fitted]).set_index("Model")
+    prediction.add_costs(perf, {row["Model"]: model for model, row in fitted}, X.iloc[split:].to_numpy()[-1:])
+    print("model backends (DMART, 90/10 split)")
+    print(perf[["RMSE", "MAPE (%)"] + prediction.COST_COLS].round(3).to_string())
+    trees = perf.drop(index="Ridge Regression")
+    for budget in ({}, {"Predict (ms)": 5.0}, {"Size (MB)": 5.0}, {"Fit (s)": 1.0}):
+        print(f"  best tree model within {budget or 'no budget'}: {prediction.select_model(trees, budget)}")
+
+# Simulated upstream latency per endpoint for bench_marketdata (seconds)
+FAKE_LATENCY = {"history": 0.30, "info": 0.20, "news": 0.10}
+
+class _FakeMarketHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        endpoint = self.path.strip("/").split("/")[0]
+        time.sleep(FAKE_LATENCY.get(endpoint, 0))
+        body = json.dumps({"endpoint": endpoint, "news": [{"title": "fake headline"}]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): pass
+
+class _HTTPSource:
+    """marketdata source backed by the local fake server over one pooled requests.Session."""
+    def __init__(self, base):
+        import requests
+        self.base = base
+        self.session = requests.Session()
+
+    def _get(self, endpoint, symbol):
+        return self.session.get(f"{self.base}/{endpoint}/{symbol}", timeout=5).json()
+
+    def history(self, symbol):
+        self._get("history", symbol)
+        return load_price_csv()
+
+    def info(self, symbol): return self._get("info", symbol)
+
+    def news(self, symbol): return marketdata.format_news(self._get("news", symbol)["news"])
+
+    def price(self, symbol): return 0.0
+
+def bench_marketdata():
+    """Page fetch against a local fake HTTP server: history, info, news one after another vs the async client."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeMarketHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        source = _HTTPSource(f"http://127.0.0.1:{server.server_port}")
+        print(f"page fetch, simulated latency {FAKE_LATENCY}")
+        _report("sequential history + info + news", _timeit(lambda: (source.history("X"), source.info("X"), source.news("X")), repeat=3))
+        client = marketdata.MarketDataClient(source)
+        symbols = iter(range(10 ** 6))
+        _report("MarketDataClient.page_sync (cold)", _timeit(lambda: client.page_sync(f"S{next(symbols)}"), repeat=3))
+        client.page_sync("X")
+        _report("MarketDataClient.page_sync (TTL hit)", _timeit(lambda: client.page_sync("X")))
+        slow = marketdata.MarketDataClient(source, endpoints={"news": (0.05, 600, "NEWS FEED OFFLINE")})
+        t0 = time.perf_counter()
+        page = slow.page_sync("Y")
+        _report("page with a 50 ms news timeout", time.perf_counter() - t0)
+        print(f"  news after timeout: {page[2]!r}")
+        client.close()
+        slow.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def bench_compare():
+    """Six 10-year daily series: full-resolution Plotly payload vs LTTB to 1200 points, and the shared payload cache."""
+    import plotly.graph_objects as go
+    histories = {f"SYN{i}.NS": synthetic_prices(2500, i).assign(Date=lambda d: pd.date_range("2015-01-01", periods=len(d), freq="D")) for i in range(6)}
+    panel = comparison.close_panel(histories)
+    returns = comparison.normalized_returns(panel)
+    days = returns.index.to_numpy().astype('datetime64[D]').astype(np.int64)
+    def figure(points):
+        fig = go.Figure()
+        for t in returns.columns:
+            keep = comparison.lttb(days, returns[t].to_numpy(), points)
+            fig.add_trace(go.Scattergl(x=returns.index[keep], y=returns[t].to_numpy()[keep], mode="lines"))
+        return fig.to_json()
+    print(f"comparison chart, {len(returns.columns)} tickers x {len(returns)} days")
+    _report("normalized_returns (one pass)", _timeit(lambda: comparison.normalized_returns(panel)))
+    _report("lttb 2500 -> 1200 points", _timeit(lambda: comparison.lttb(days, returns.iloc[:, 0].to_numpy(), comparison.CHART_WIDTH)))
+    big = np.cumsum(np.random.default_rng(0).normal(size=1_000_000))
+    _report("lttb 1,000,000 -> 1200 points", _timeit(lambda: comparison.lttb(np.arange(len(big)), big, comparison.CHART_WIDTH), repeat=3))
+    print(f"  figure JSON: full {len(figure(len(returns))) / 1e3:,.0f} kB, LTTB {len(figure(comparison.CHART_WIDTH)) / 1e3:,.0f} kB, LTTB@600 {len(figure(600)) / 1e3:,.0f} kB")
+
+def bench_tuning():
+    """Successive-halving search per model on DMART; work is training rows summed over candidates, vs every candidate on all rows."""
+    df = load_price_csv()
+    data = prediction.prepare_features(df)
+    X = data[prediction.FEATURE_COLS].to_numpy(dtype=np.float64)
+    y = data['Close'].to_numpy(dtype=np.float64)
+    print(f"hyperparameter search on DMART ({len(X)} rows, {tuning.CANDIDATES} candidates, eta {tuning.ETA})")
+    for name in prediction.MODEL_SPECS:
+        t0 = time.perf_counter()
+        r = tuning.successive_halving(name, X, y, n_jobs=1)
+        seconds = time.perf_counter() - t0
+        work = sum(rows * n for rows, n in r['rungs']) / (r['rungs'][0][1] * len(X))
+        print(f"  {name:<20}{seconds:8.1f} s  {r['fits']:3d} fits  work {work:.0%} of a full search  RMSE {r['rmse']:.2f}  {r['params']}")
+
+def bench_verdict_history():
+    """Rating history for 6 tickers: generate_verdict per ticker-date vs one verdict.score_panel pass."""
+    dates = 2500
+    frames = {"DMART.NS": load_price_csv(), **{f"SYN{i}.NS": synthetic_prices(dates, i) for i in range(1, 6)}}
+    close = pd.DataFrame({t: df['Close'].to_numpy()[-dates:] if len(df) >= dates else np.r_[np.full(dates - len(df), np.nan), df['Close'].to_numpy()]
+                          for t, df in frames.items()})
+    growth = pd.Series(np.linspace(-5, 40, len(frames)), index=close.columns)
+    pe = pd.Series(np.linspace(20, 90, len(frames)), index=close.columns)
+    sample = 200
+    def loop():
+        for t in close.columns:
+            s = close[t].dropna().to_frame('Close')
+            for end in range(len(s) - sample, len(s)):
+                verdict.generate_verdict({"trailingPE": pe[t]}, s.iloc[:end + 1], {"Revenue": {"pct": growth[t]}}, {})
+    cells = close.notna().to_numpy().sum()
+    print(f"verdict history ({len(frames)} tickers x {dates} dates)")
+    print(f"  {'generate_verdict per ticker-date':<40} {_timeit(loop, repeat=1) / (sample * len(frames)) * 1e6:10.2f} us")
+    print(f"  {'score_panel + rating_panel per cell':<40} {_timeit(lambda: verdict.rating_panel(verdict.score_panel(close, growth, pe))) / cells * 1e6:10.3f} us")
+    _report("full history + rating_flips", _timeit(lambda: verdict.rating_flips(verdict.rating_panel(verdict.score_panel(close, growth, pe)))))
+
+def online_accuracy(df, origins=250):
+    """
+    One-step-ahead errors of the online forecaster replayed over the last
+    `origins` bars, next to the ensemble's walk-forward errors on the same bars.
+    """
+    fc = online.OnlineForecaster.from_history(df.iloc[:-origins])
+    preds = np.array([fc.update(bar) for bar in df.iloc[-origins:].to_dict('records')], dtype=np.float64)
+    actual = df['Close'].to_numpy(dtype=np.float64)[-origins:]
+    ensemble = prediction.forecast_batch({"DMART.NS": df}, 30)["DMART.NS"].metrics
+    return {"rmse": float(np.sqrt(np.nanmean((preds - actual) ** 2))), "mape": float(np.nanmean(np.abs(preds - actual) / actual) * 100),
+            "ensemble_rmse": ensemble.get("WF RMSE", np.nan), "ensemble_mape": ensemble.get("WF MAPE", np.nan)}
+
+def bench_online():
+    """Live refresh: retraining the ensemble vs an RLS update and forecast; accuracy vs the ensemble's walk-forward."""
+    df = load_price_csv()
+    fc = online.OnlineForecaster.from_history(df.iloc[:-1])
+    bar = df.iloc[-1].to_dict()
+    def one_bar():
+        f = fc.engine.copy()
+        row = f.append(bar)
+        fc.learn(online.OnlineForecaster.features(row), row['Close'])
+    n = 1000
+    print("forecast refresh after a new bar (DMART)")
+    _report("retrain run_ensemble_forecast", _timeit(lambda: prediction.run_ensemble_forecast(df, 30), repeat=1))
+    _report("OnlineForecaster update (copy + RLS step)", _timeit(lambda: [one_bar() for _ in range(n)], repeat=3) / n)
+    _report("OnlineForecaster.forecast(30)", _timeit(lambda: [fc.forecast(30) for _ in range(n)], repeat=3) / n)
+    _report("OnlineForecaster.nowcast(price, 30)", _timeit(lambda: [fc.nowcast(3800.0, 30) for _ in range(n)], repeat=3) / n)
+    acc = online_accuracy(df)
+    print(f"  one-step over the last 250 bars: online RMSE {acc['rmse']:.2f} / MAPE {acc['mape']:.2f}%,"
+          f" ensemble walk-forward RMSE {acc['ensemble_rmse']:.2f} / MAPE {acc['ensemble_mape']:.2f}%")
+
+APP_MODULES = ["companies", "comparison", "market", "feed", "financials", "instrument", "prediction", "snapshot", "verdict"]
+HEAVY_PACKAGES = ["sklearn", "joblib", "yfinance", "requests"]
+
+def import_profile(code):
+    """
+    Runs code in a fresh interpreter under -X importtime. Returns
+    {module: (self_us, cumulative_us, depth)} plus the heavy packages it loaded.
+    """
+    probe = f"{code}\nimport sys; print(','.join(p for p in {HEAVY_PACKAGES!r} if p in sys.modules))"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", probe], capture_output=True, text=True,
+                          cwd=os.path.dirname(os.path.abspath(__file__)))
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line: continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cum_us), (len(name) - len(name.lstrip()) - 1) // 2)
+    loaded = [p for p in proc.stdout.strip().splitlines()[-1].split(",") if p] if proc.stdout.strip() else []
+    return modules, loaded
+
+def bench_imports():
+    """Cold-start import cost of the modules main.py loads, and what the lazy imports defer."""
+    modules, loaded = import_profile("import " + ", ".join(APP_MODULES))
+    total = sum(cum for _, cum, depth in modules.values() if depth == 0)
+    print("cold import of the app modules (python -X importtime)")
+    for name in APP_MODULES:
+        if name in modules: print(f"  {name:<40} {modules[name][1] / 1000:10.1f} ms")
+    print(f"  {'total':<40} {total / 1000:10.1f} ms")
+    print(f"  heavy packages loaded: {', '.join(loaded) or 'none'}")
+    print("  slowest modules by self time:")
+    for name, (own, _, _) in sorted(modules.items(), key=lambda kv: -kv[1][0])[:8]:
+        print(f"    {name:<38} {own / 1000:10.1f} ms")
+    print("deferred until first use")
+    for label, code in (("first model build (sklearn)", "import prediction; prediction.Ridge.resolve(); prediction.RandomForestRegressor.resolve()"),
+                        ("first network call (yfinance)", "import yfinance")):
+        mods, _ = import_profile(code)
+        print(f"  {label:<40} {sum(cum for _, cum, depth in mods.values() if depth == 0) / 1000:10.1f} ms")
+
+BENCHMARKS = {
+    "statements": bench_statements,
+    "registry": bench_registry,
+    "parallel": bench_parallel,
+    "forecaster": bench_forecaster,
+    "indicators": bench_indicators,
+    "store": bench_store,
+    "sector": bench_sector,
+    "metric_lookup": bench_metric_lookup,
+    "walk_forward": bench_walk_forward,
+    "memory": bench_memory,
+    "instrument": bench_instrument,
+    "imports": bench_imports,
+    "batch": bench_batch,
+    "verdict_history": bench_verdict_history,
+    "online": bench_online,
+    "tuning": bench_tuning,
+    "backends": bench_backends,
+    "marketdata": bench_marketdata,
+    "compare": bench_compare,
+}
+
+BASELINE_FILE = "benchmark_baseline.json"
+SUITE_SIZES = (10_000, 100_000, 1_000_000)
+
+def synthetic_prices(n, seed=0):
+    """n random-walk bars in the fetch_history_data layout, one per minute from 2000-01-01."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return pd.DataFrame({
+        "Date": pd.date_range("2000-01-01", periods=n, freq="min"),
+        "Open": close, "High": close * 1.001, "Low": close * 0.999, "Close": close,
+        "Volume": rng.integers(1000, 10000, n)
+    })
+
+def _measure(fn, repeat, units):
+    """
+    Latency percentiles over repeat runs (after a warm-up run for the cheap
+    cases), throughput at p50, peak memory of one extra traced run.
+    """
+    if repeat > 3: fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    _, peak = _peak(fn)
+    p50, p90, p99 = np.percentile(times, [50, 90, 99])
+    return {"runs": repeat, "p50_ms": p50 * 1000, "p90_ms": p90 * 1000, "p99_ms": p99 * 1000,
+            "mean_ms": float(np.mean(times)) * 1000, "throughput": units / p50, "peak_mib": peak / 2 ** 20}
+
+def suite_cases(quick=False):
+    """
+    (name, fn, units per call, unit label, repeat[, quality]) for every suite
+    case; quality() returns error metrics stored and compared with the timings.
+    """
+    sizes = SUITE_SIZES[:1] if quick else SUITE_SIZES
+    cases = []
+
+    def cold():
+        financials.clear_statement_cache(disk=True)
+        for c in COMPANIES: financials.load_local_data(c)
+    def warm():
+        for c in COMPANIES: financials.load_local_data(c)
+    cases += [("load_local_data/cold", cold, len(COMPANIES), "companies", 5),
+              ("load_local_data/warm", warm, len(COMPANIES), "companies", 50)]
+
+    dmart = load_price_csv()
+    prices = {"dmart": dmart, **{f"{n // 1000}k": synthetic_prices(n) for n in sizes}}
+    for label, df in prices.items():
+        cases.append((f"add_technical_indicators/{label}", lambda df=df: market.add_technical_indicators(df), len(df), "bars", 5 if len(df) > 100_000 else 20))
+
+    for label in ("dmart",) + (() if quick else ("10k",)):
+        data = prediction.prepare_features(prices[label])
+        X, y = data[prediction.FEATURE_COLS], data['Close']
+        split = int(len(data) * 0.9)
+        args = (X.iloc[:split], y.iloc[:split], X.iloc[split:], y.iloc[split:])
+        for name in prediction.MODEL_SPECS:
+            cases.append((f"fit/{name}/{label}", lambda name=name, args=args: prediction._fit_candidate(name, *args), split, "rows", 3))
+    cases.append(("run_ensemble_forecast/dmart", lambda: prediction.run_ensemble_forecast(dmart, 30), 30, "days", 1 if quick else 3))
+
+    data = prediction.prepare_features(dmart)
+    state = prediction.state_vector(data.iloc[-1][['Date', 'Close'] + prediction.FEATURE_COLS].to_dict())
+    for name in prediction.MODEL_SPECS:
+        forecaster = prediction.RecursiveForecaster(prediction._fit_final(name, data[prediction.FEATURE_COLS], data['Close']))
+        cases.append((f"recursive_forecast/{name}", lambda f=forecaster: f.forecast(state, 30), 30, "steps", 20))
+
+    live = online.OnlineForecaster.from_history(dmart)
+    cases.append(("online/nowcast", lambda: live.nowcast(float(dmart['Close'].iloc[-1]), 30), 1, "forecasts", 200, lambda: online_accuracy(dmart)))
+
+    growth = financials.calculate_growth_metrics(financials.load_local_data(COMPANIES[0]))
+    info = {"trailingPE": 85.0}
+    for label, df in prices.items():
+        cases.append((f"generate_verdict/{label}", lambda df=df: verdict.generate_verdict(info, df, growth, {}), 1, "verdicts", 20))
+    return cases
+
+def run_suite(quick=False):
+    results = {}
+    print(f"{'CASE':<44}{'P50 ms':>10}{'P90 ms':>10}{'P99 ms':>10}{'THROUGHPUT':>20}{'PEAK MiB':>10}")
+    for name, fn, units, unit, repeat, *quality in suite_cases(quick):
+        r = _measure(fn, repeat, units)
+        r["unit"] = unit
+        if quality: r.update(quality[0]())
+        results[name] = r
+        print(f"{name:<44}{r['p50_ms']:10.2f}{r['p90_ms']:10.2f}{r['p99_ms']:10.2f}{r['throughput']:>13,.0f} {unit + '/s':<6}{r['peak_mib']:10.1f}")
+        if "rmse" in r: print(f"{'':<4}one-step RMSE {r['rmse']:.2f} (ensemble walk-forward {r['ensemble_rmse']:.2f}), MAPE {r['mape']:.2f}% ({r['ensemble_mape']:.2f}%)")
+    return results
+
+def _environment():
+    import sklearn
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "sklearn": sklearn.__version__, "cpus": os.cpu_count(), "machine": platform.machine()}
+
+def compare(results, baseline, tolerance):
+    """Prints the cases whose p50, peak memory or one-step RMSE regressed past tolerance; returns their names."""
+    regressions = []
+    print(f"\nvs baseline ({baseline.get('saved_at', '?')}, tolerance {tolerance:.0%})")
+    for name, r in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"  {name:<44} new case")
+            continue
+        time_ratio = r["p50_ms"] / old["p50_ms"] if old["p50_ms"] else 1.0
+        mem_ratio = r["peak_mib"] / old["peak_mib"] if old["peak_mib"] else 1.0
+        # sub-millisecond cases are dominated by timer noise, so they need a 1 ms absolute change as well
+        slow = time_ratio > 1 + tolerance and r["p50_ms"] - old["p50_ms"] > 1.0
+        fat = mem_ratio > 1 + tolerance and r["peak_mib"] - old["peak_mib"] > 1.0
+        worse = "rmse" in r and "rmse" in old and r["rmse"] > old["rmse"] * (1 + tolerance)
+        flag = "REGRESSION" if slow or fat or worse else ""
+        if flag: regressions.append(name)
+        print(f"  {name:<44} time x{time_ratio:5.2f}  memory x{mem_ratio:5.2f}  {flag}")
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the analytics pipeline")
+    parser.add_argument("names", nargs="*", help=f"ad-hoc benchmarks: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--suite", action="store_true", help="run the regression suite")
+    parser.add_argument("--quick", action="store_true", help="suite: only the 10k synthetic series, skip the 10k model fits")
+    parser.add_argument("--save-baseline", action="store_true", help=f"suite: write the results to {BASELINE_FILE}")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative growth in p50 / peak memory")
+    args = parser.parse_args(argv)
+
+    if not args.suite:
+        for name in args.names or list(BENCHMARKS): BENCHMARKS[name]()
+        return 0
+
+    results = run_suite(args.quick)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump({"saved_at": time.strftime("%Y-%m-%d %H:%M:%S"), "environment": _environment(), "results": results}, f, indent=1)
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"\nno baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+    with open(args.baseline) as f: baseline = json.load(f)
+    if baseline.get("environment") != _environment(): print("\nnote: baseline was recorded in a different environment")
+    return 1 if compare(results, baseline, args.tolerance) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+# Company universe shown in the sidebar, by market segment
+SEGMENTS = {
+    "Large Cap": {"DMart": {"ticker": "DMART.NS", "file": "Avenue Supermarts Ltd."}, "Titan": {"ticker": "TITAN.NS", "file": "Titan Company Ltd."}},
+    "Mid Cap": {"Kalyan Jewellers": {"ticker": "KALYANKJIL.NS", "file": "Kalyan Jewellers India Ltd."}, "Metro Brands": {"ticker": "METROBRAND.NS", "file": "Metro Brands Ltd."}},
+    "Small Cap": {"Ethos Ltd": {"ticker": "ETHOSLTD.NS", "file": "Ethos Ltd."}, "Arvind Fashions": {"ticker": "ARVINDFASN.NS", "file": "Arvind Fashions Ltd."}}
+}
+
+def all_companies():
+    """Flat {label: {"ticker", "file", "segment"}} over every segment."""
+    return {label: dict(entry, segment=seg) for seg, comp_map in SEGMENTS.items() for label, entry in comp_map.items()}
+
+def tickers():
+    return [entry["ticker"] for entry in all_companies().values()]
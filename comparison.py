@@ -0,0 +1,96 @@
+"""
+Multi-company comparison payloads.
+
+Closes for the selected tickers are read concurrently (market.fetch_histories),
+aligned into one (date x ticker) panel and turned into returns relative to
+each ticker's first close in the window in a single vectorized pass. Every
+series is then downsampled with LTTB (largest triangle three buckets) to
+about one point per horizontal pixel, which keeps the peaks and troughs a
+plain stride would drop. Payloads are memoized process-wide, so every
+session viewing the same selection shares one computation; a new bar for any
+ticker changes the key.
+
+    payload = comparison.payload(["DMART.NS", "TITAN.NS"], width=1200, years=10)
+"""
+import numpy as np
+import pandas as pd
+
+import cache
+import instrument
+import market
+
+CHART_WIDTH = 1200
+PERIODS = {"1Y": 1, "3Y": 3, "5Y": 5, "10Y": 10, "MAX": None}
+
+_PAYLOADS = cache.LRUCache(maxsize=32)
+instrument.watch_cache("compare_payloads", _PAYLOADS)
+
+def lttb(x, y, n_out):
+    """
+    Indices of the n_out points LTTB keeps from (x, y); the first and last
+    point are always kept. Returns every index when n_out >= len(x).
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3: return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # n_out - 2 buckets over the interior points, plus the bucket means the
+    # triangle of each bucket is closed against
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    cx, cy = np.concatenate([[0.0], np.cumsum(x)]), np.concatenate([[0.0], np.cumsum(y)])
+    size = np.diff(edges)
+    mean_x = np.append((cx[edges[1:]] - cx[edges[:-1]]) / size, x[-1])
+    mean_y = np.append((cy[edges[1:]] - cy[edges[:-1]]) / size, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        ax, ay, bx, by = x[a], y[a], mean_x[i + 1], mean_y[i + 1]
+        area = np.abs((ax - bx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (by - ay))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+def close_panel(histories, years=None):
+    """(date x ticker) closes, outer-joined on date, cut to the last `years`."""
+    panel = pd.concat({t: df.set_index('Date')['Close'] for t, df in histories.items() if len(df)}, axis=1).sort_index()
+    if years is not None and len(panel):
+        panel = panel[panel.index >= panel.index[-1] - pd.DateOffset(years=years)]
+    return panel
+
+def normalized_returns(panel):
+    """Percent change from each column's first valid close, for every column at once."""
+    values = panel.to_numpy(dtype=np.float64)
+    valid = ~np.isnan(values)
+    first = values[valid.argmax(axis=0), np.arange(values.shape[1])]
+    return pd.DataFrame((values / first - 1) * 100, index=panel.index, columns=panel.columns)
+
+def _key(tickers, histories, width, years):
+    last = tuple((t, len(df), str(df['Date'].iloc[-1]) if len(df) else None) for t, df in histories.items())
+    return (tuple(tickers), width, years, last)
+
+@instrument.timed(rows=lambda r: r["points"])
+def payload(tickers, width=CHART_WIDTH, years=None):
+    """
+    {"series": {ticker: {"x": dates, "y": returns %}}, "points", "raw_points"}
+    with each series downsampled to at most `width` points.
+    """
+    histories = market.fetch_histories(tickers)
+    key = _key(tickers, histories, width, years)
+    out = _PAYLOADS.get(key)
+    if out is not None: return out
+
+    returns = normalized_returns(close_panel(histories, years)) if any(len(df) for df in histories.values()) else pd.DataFrame()
+    days = returns.index.to_numpy().astype('datetime64[D]').astype(np.int64)
+    series, raw = {}, 0
+    for t in returns.columns:
+        mask = ~np.isnan(returns[t].to_numpy())
+        x, y = days[mask], returns[t].to_numpy()[mask]
+        keep = lttb(x, y, width)
+        raw += len(x)
+        series[t] = {"x": returns.index[mask][keep], "y": y[keep]}
+    out = {"series": series, "points": sum(len(s["y"]) for s in series.values()), "raw_points": raw}
+    _PAYLOADS.put(key, out)
+    return out
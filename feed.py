@@ -0,0 +1,149 @@
+"""
+Process-wide live price feed.
+
+Every Streamlit session shares one PriceFeed. It polls each watched ticker
+once per interval from a background thread and serves the latest quote from
+memory, so upstream load scales with tickers instead of viewers.
+"""
+import os
+import threading
+import time
+
+import store
+
+class YahooQuoteSource:
+    def quote(self, ticker):
+        import yfinance as yf
+        return float(yf.Ticker(ticker).fast_info['last_price'])
+
+class ReplayQuoteSource:
+    """
+    Offline stand-in: replays closes from yf.download CSV dumps, advancing
+    one bar per poll and wrapping at the end. By default it picks up every
+    <SYMBOL>_stock_10yrs.csv in the working directory as <SYMBOL>.NS.
+    """
+    def __init__(self, files=None):
+        self.files = store.csv_dumps() if files is None else files
+        self._closes = {}
+        self._pos = {}
+
+    def quote(self, ticker):
+        if ticker not in self._closes:
+            if ticker not in self.files: raise KeyError(f"no replay file for {ticker}")
+            self._closes[ticker] = store.read_price_csv(self.files[ticker])['Close'].to_numpy()
+            self._pos[ticker] = 0
+        closes = self._closes[ticker]
+        price = float(closes[self._pos[ticker] % len(closes)])
+        self._pos[ticker] += 1
+        return price
+
+class PriceFeed:
+    """
+    Polls each watched ticker once per interval and fans the latest quote
+    out to every caller. Concurrent first requests for a ticker share one
+    upstream call, failures back off exponentially (up to max_backoff), and
+    tickers nobody has asked for within idle_after seconds stop being polled.
+    """
+    def __init__(self, source, interval=5.0, max_backoff=120.0, idle_after=60.0):
+        self.source = source
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.idle_after = idle_after
+        self.quotes = {}
+        self.upstream_calls = 0
+        self._watch = {}
+        self._due = {}
+        self._failures = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="price-feed", daemon=True)
+            self._thread.start()
+
+    def _fetch(self, ticker):
+        """One upstream call per ticker at a time; late arrivals wait for the running one."""
+        with self._lock:
+            pending = self._inflight.get(ticker)
+            if pending is None:
+                pending = self._inflight[ticker] = threading.Event()
+                self.upstream_calls += 1
+                owner = True
+            else: owner = False
+        if not owner:
+            pending.wait(timeout=self.interval)
+            return
+        try:
+            price = self.source.quote(ticker)
+            with self._lock:
+                self.quotes[ticker] = (price, time.time())
+                self._failures[ticker] = 0
+                self._due[ticker] = time.monotonic() + self.interval
+        except Exception:
+            with self._lock:
+                fails = self._failures.get(ticker, 0) + 1
+                self._failures[ticker] = fails
+                self._due[ticker] = time.monotonic() + min(self.interval * 2 ** fails, self.max_backoff)
+        finally:
+            with self._lock: del self._inflight[ticker]
+            pending.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                for ticker in [t for t, seen in self._watch.items() if now - seen > self.idle_after]:
+                    del self._watch[ticker]
+                due = [t for t in self._watch if self._due.get(t, 0) <= now]
+                wait = min([self._due.get(t, now) for t in self._watch] or [now + self.interval]) - now
+            for ticker in due: self._fetch(ticker)
+            self._wake.wait(timeout=max(wait, 0.05))
+            self._wake.clear()
+
+    def watch(self, ticker):
+        with self._lock:
+            new = ticker not in self._watch
+            self._watch[ticker] = time.monotonic()
+        self._ensure_thread()
+        # a newly watched ticker is due now; don't leave it waiting out the poller's sleep
+        if new: self._wake.set()
+
+    def latest(self, ticker, wait=True):
+        """
+        Latest (price, unix time) for ticker, or None. The first request for a
+        ticker fetches synchronously (coalesced) unless wait is False or the
+        ticker is backing off after errors. A quote older than idle_after
+        (left over from before the ticker went idle) counts as missing.
+        """
+        self.watch(ticker)
+        quote = self.quotes.get(ticker)
+        if quote is not None and time.time() - quote[1] > self.idle_after: quote = None
+        if quote is None and wait and self._due.get(ticker, 0) <= time.monotonic():
+            self._fetch(ticker)
+            quote = self.quotes.get(ticker)
+        return quote
+
+    def price(self, ticker, default=0.0):
+        quote = self.latest(ticker)
+        return quote[0] if quote else default
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+_FEED = None
+_FEED_LOCK = threading.Lock()
+
+def get_feed():
+    """The shared feed. RSA_PRICE_SOURCE=replay switches to the offline replay source."""
+    global _FEED
+    with _FEED_LOCK:
+        if _FEED is None:
+            source = ReplayQuoteSource() if os.environ.get("RSA_PRICE_SOURCE") == "replay" else YahooQuoteSource()
+            _FEED = PriceFeed(source, interval=float(os.environ.get("RSA_PRICE_INTERVAL", 5)))
+        return _FEED
@@ -1,150 +1,383 @@
 import pandas as pd
 import numpy as np
 import os
+import re
+import hashlib
+import threading
 
+import cache
+import instrument
+
+STATEMENT_CACHE = cache.LRUCache(maxsize=24)
+instrument.watch_cache("statements", STATEMENT_CACHE)
+
+def fiscal_year(label):
+    """'Mar 2016' -> 2016 (None without a four-digit year)"""
+    m = re.search(r'(\d{4})', str(label))
+    return int(m.group(1)) if m else None
+
+class MetricTable:
+    """Process-wide interned metric labels: every distinct label gets one small integer id."""
+    __slots__ = ("names", "ids", "_lock")
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+        self._lock = threading.Lock()
+
+    def intern(self, labels):
+        """int32 ids for labels, adding the unseen ones."""
+        with self._lock:
+            out = np.empty(len(labels), dtype=np.int32)
+            for i, label in enumerate(labels):
+                mid = self.ids.get(label)
+                if mid is None:
+                    mid = self.ids[label] = len(self.names)
+                    self.names.append(label)
+                out[i] = mid
+            return out
+
+    def lookup(self, ids):
+        return [self.names[i] for i in ids]
+
+METRIC_TABLE = MetricTable()
+
+class Statement:
+    """
+    One financial statement in columnar form: a C-contiguous float64
+    (metric x year) matrix, interned metric ids for its rows, integer fiscal
+    years and the original period labels ("Mar 2016") for display. Rows come
+    out as zero-copy views; the object is shared through the statement cache,
+    so treat it as read-only.
+    """
+    __slots__ = ("values", "metric_ids", "years", "periods", "_index")
+
+    def __init__(self, values, metric_ids, periods):
+        self.values = np.ascontiguousarray(values, dtype=np.float64)
+        self.values.flags.writeable = False
+        self.metric_ids = np.asarray(metric_ids, dtype=np.int32)
+        self.periods = pd.Index(list(periods))
+        self.years = np.array([fiscal_year(p) or -1 for p in self.periods], dtype=np.int64)
+        self._index = None
+
+    @classmethod
+    def from_labels(cls, values, labels, periods):
+        return cls(values, METRIC_TABLE.intern([str(label) for label in labels]), periods)
+
+    @property
+    def labels(self):
+        return METRIC_TABLE.lookup(self.metric_ids)
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    @property
+    def index(self):
+        """MetricIndex over the rows, built on first use."""
+        if self._index is None: self._index = MetricIndex(self.labels, self.values)
+        return self._index
+
+    def row(self, pos):
+        """Zero-copy view of one metric across years."""
+        return self.values[pos]
+
+    def series(self, pos):
+        return pd.Series(self.values[pos], index=self.periods, name=METRIC_TABLE.names[self.metric_ids[pos]], copy=False)
+
+    def frame(self):
+        """(metric x period) DataFrame over the same buffer, for display and ad-hoc use."""
+        return pd.DataFrame(self.values, index=pd.Index(self.labels, name='Metric'), columns=self.periods, copy=False)
+
+    def __len__(self):
+        return len(self.metric_ids)
+
+    def __repr__(self):
+        years = f"{self.years.min()}-{self.years.max()}" if len(self.years) else "no years"
+        return f"Statement({len(self)} metrics, {years})"
+
+EMPTY = Statement(np.empty((0, 0)), [], [])
+
+def _parse_statement(path):
+    """CSV export -> (values, metric labels, period labels). All cells are coerced in one pass."""
+    df = pd.read_csv(path, header=2, dtype=str)
+    df.rename(columns={df.columns[0]: 'Metric'}, inplace=True)
+    df = df[~df['Metric'].astype(str).str.contains('12 mths|^-|^\\s*$', regex=True, na=False)]
+    df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
+    labels = np.where(df['Metric'].isna(), '', df['Metric'].astype(str).str.strip())
+    cells = df.drop(columns='Metric').to_numpy(dtype=str)
+    values = pd.to_numeric(np.char.replace(cells, ',', '').ravel(), errors='coerce').astype(np.float64).reshape(cells.shape)
+    return values, labels, list(df.columns[1:])
+
+def load_statement(path):
+    """
+    Cached Statement for a CSV export. Lookup order is the in-process LRU,
+    then the on-disk .npz (float64 matrix + metric/period labels), then a
+    full CSV parse. Entries are keyed on path + mtime + size, so editing a
+    CSV invalidates both layers.
+    """
+    key = cache.file_key(path)
+    stmt = STATEMENT_CACHE.get(key)
+    if stmt is not None: return stmt
+
+    STATEMENT_CACHE.discard(lambda k: k[0] == key[0])
+    disk_file = cache.cache_path("statements", f"{hashlib.sha1(key[0].encode()).hexdigest()}.npz")
+    stamp = np.array([key[1], key[2]], dtype=np.int64)
+    try:
+        with np.load(disk_file) as npz:
+            if np.array_equal(npz['stamp'], stamp):
+                stmt = Statement.from_labels(npz['values'], npz['metrics'].tolist(), npz['columns'].tolist())
+    except (OSError, KeyError, ValueError): pass
+
+    if stmt is None:
+        values, labels, periods = _parse_statement(path)
+        stmt = Statement.from_labels(values, labels, periods)
+        try:
+            def write(tmp):
+                with open(tmp, 'wb') as f:
+                    np.savez(f, stamp=stamp, values=stmt.values, metrics=np.array(labels, dtype=str), columns=np.array(periods, dtype=str))
+            cache.atomic_write(disk_file, write)
+        except OSError: pass
+
+    STATEMENT_CACHE.put(key, stmt)
+    return stmt
+
+def clear_statement_cache(disk=False):
+    STATEMENT_CACHE.clear()
+    if disk:
+        folder = os.path.join(cache.CACHE_DIR, "statements")
+        if os.path.isdir(folder):
+            for fname in os.listdir(folder): os.remove(os.path.join(folder, fname))
+
+_STATEMENT_FILES = {}
+
+def find_statement_file(base_name, folder="."):
+    """
+    Locates <base_name>.csv (or the "..csv" variant the exports produce when
+    the company name ends in a dot). Falls back to a case-insensitive match,
+    which covers the "Statement of Cash FLow_" spelling of the bundled files.
+    Resolved paths are remembered until the folder's mtime changes.
+    """
+    try: stamp = os.stat(folder).st_mtime_ns
+    except OSError: return None
+    key = (base_name, os.path.abspath(folder))
+    hit = _STATEMENT_FILES.get(key)
+    if hit is not None and hit[0] == stamp: return hit[1]
+
+    path = None
+    for fname in (f"{base_name}.csv", f"{base_name}..csv"):
+        if os.path.exists(os.path.join(folder, fname)):
+            path = os.path.join(folder, fname)
+            break
+    if path is None:
+        wanted = {f"{base_name}.csv".lower(), f"{base_name}..csv".lower()}
+        for fname in sorted(os.listdir(folder)):
+            if fname.lower() in wanted:
+                path = os.path.join(folder, fname)
+                break
+    _STATEMENT_FILES[key] = (stamp, path)
+    return path
+
+STATEMENTS = {
+    "PL": "Statement of Profit & Loss",
+    "BS": "Assets & Liabilities",
+    "Ratios": "Financial Ratios",
+    "CF": "Statement of Cash Flow"
+}
+
+@instrument.timed()
 def load_local_data(company_name):
     datasets = {}
-    base_files = {
-        "PL": f"Statement of Profit & Loss_{company_name}",
-        "BS": f"Assets & Liabilities_{company_name}",
-        "Ratios": f"Financial Ratios_{company_name}"
-    }
-    
-    for key, base_name in base_files.items():
-        possible_names = [f"{base_name}.csv", f"{base_name}..csv"]
-        found_file = None
-        for fname in possible_names:
-            if os.path.exists(fname):
-                found_file = fname
-                break
-        
+    for key, prefix in STATEMENTS.items():
+        found_file = find_statement_file(f"{prefix}_{company_name}")
         if found_file:
             try:
-                df = pd.read_csv(found_file, header=2)
-                df.rename(columns={df.columns[0]: 'Metric'}, inplace=True)
-                df = df[~df['Metric'].astype(str).str.contains('12 mths|^-|^\s*$', regex=True, na=False)]
-                df.set_index('Metric', inplace=True)
-                df.index = df.index.astype(str).str.strip()
-                df = df.loc[:, ~df.columns.str.contains('^Unnamed')]
-                for col in df.columns:
-                    df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', ''), errors='coerce')
-                datasets[key] = df
+                datasets[key] = load_statement(found_file)
             except:
-                datasets[key] = pd.DataFrame()
+                datasets[key] = EMPTY
         else:
-            datasets[key] = pd.DataFrame()
+            datasets[key] = EMPTY
     return datasets
 
-def get_latest_value(df, keywords):
-    if df.empty: return 0.0
-    for idx in df.index:
-        if any(k.lower() in str(idx).lower() for k in keywords):
-            row = df.loc[idx]
-            for val in row.values[::-1]:
-                if pd.notna(val) and val != 0: return val
-    return 0.0
+# Declarative synonym table. Each metric is an ordered list of stages (later
+# stages are fallbacks). A stage picks the first row whose label contains any
+# "contains" keyword and none of the "excludes" keywords, or equals an "exact"
+# label.
+# Matching is case-insensitive unless "case" is set.
+TREND_RULES = {
+    "PL": {
+        "Revenue": [{"contains": ["revenue from operations", "total revenue"]}],
+        "Net Income": [
+            {"contains": ["profit for the period", "profit for the year", "net profit after tax"]},
+            {"contains": ["net profit"], "excludes": ["before"]},
+            {"contains": ["profit", "loss"], "excludes": ["before", "gross", "operating", "cash"]}
+        ]
+    },
+    "BS": {
+        "Total Assets": [{"contains": ["Total Assets", "Equity & Liabilities"], "case": True}],
+        "Total Equity": [{"contains": ["Total Equity", "Net Worth"], "exact": ["Equity"], "case": True}],
+        "Total Liabilities": [{"contains": ["Total Liabilities", "Total Debt"], "case": True}]
+    },
+    "CF": {
+        "Operating CF": [{"contains": ["net cash flow from operating activities", "cash flow from operating activities"]}],
+        "Investing CF": [{"contains": ["net cash flow from investment activities", "net cash flow from investing activities"]}],
+        "Financing CF": [{"contains": ["net cash flow from financing activities"]}],
+        "Capex": [{"contains": ["purchase of fixed assets", "purchase of property"]}]
+    }
+}
+
+# Broader matches used for the growth cards
+GROWTH_RULES = {
+    "Revenue": ("PL", {"contains": ["revenue", "sales"]}),
+    "Net Profit": ("PL", {"contains": ["profit", "loss"], "excludes": ["before", "gross", "operating", "cash"]}),
+    "Assets": ("BS", {"contains": ["total assets", "equity & liabilities"]}),
+    "Liabilities": ("BS", {"contains": ["total liabilities", "total debt"]}),
+    "Equity": ("BS", {"contains": ["total equity", "net worth"]})
+}
+
+class MetricIndex:
+    """
+    Lookup index for one statement, built once. Holds the raw and
+    lower-cased row labels (with a label -> row positions map), memoizes
+    every keyword query, and precomputes per-row first/last valid
+    (non-NaN, non-zero) values in a single NumPy pass.
+    """
+    def __init__(self, labels, values):
+        self.labels = list(labels)
+        self.lower = [s.lower() for s in self.labels]
+        self.positions = {}
+        for pos, label in enumerate(self.labels): self.positions.setdefault(label, []).append(pos)
+        self.values = values
+        self._memo = {}
+
+        valid = ~np.isnan(self.values) & (self.values != 0)
+        rows = np.arange(len(self.labels))
+        n_cols = self.values.shape[1]
+        self.count = valid.sum(axis=1)
+        self.first_idx = valid.argmax(axis=1) if n_cols else np.zeros(len(rows), dtype=int)
+        self.last_idx = n_cols - 1 - valid[:, ::-1].argmax(axis=1) if n_cols else np.zeros(len(rows), dtype=int)
+        self.first_value = self.values[rows, self.first_idx] if n_cols else np.full(len(rows), np.nan)
+        self.latest_value = self.values[rows, self.last_idx] if n_cols else np.full(len(rows), np.nan)
+
+    def match(self, contains=(), excludes=(), exact=(), case=False):
+        """Row positions (in statement order) matching one stage."""
+        key = (tuple(contains), tuple(excludes), tuple(exact), case)
+        hit = self._memo.get(key)
+        if hit is not None: return hit
+        labels = self.labels if case else self.lower
+        if not case:
+            contains, excludes = [k.lower() for k in contains], [k.lower() for k in excludes]
+        hit = np.array([pos for pos, s in enumerate(labels)
+                        if (any_hit(s, contains) or s in exact) and not any_hit(s, excludes)], dtype=int)
+        self._memo[key] = hit
+        return hit
+
+    def first(self, **stage):
+        hit = self.match(**stage)
+        return int(hit[0]) if len(hit) else None
+
+    def resolve(self, stages):
+        """First row matched by the earliest stage that matches anything."""
+        for stage in stages:
+            pos = self.first(**stage)
+            if pos is not None: return pos
+        return None
+
+    def latest_nonzero(self, keywords):
+        """Latest valid value of the first matching row that has one (get_latest_value)."""
+        hit = self.match(contains=keywords)
+        hit = hit[self.count[hit] > 0]
+        return self.latest_value[hit[0]] if len(hit) else None
+
+    def row(self, pos):
+        return self.values[pos]
+
+def any_hit(label, keywords):
+    for k in keywords:
+        if k in label: return True
+    return False
+
+def metric_index(stmt):
+    """
+    MetricIndex for a Statement (built once and kept on it, since its values
+    are read-only) or for a (metric x period) DataFrame (built on every call,
+    since the frame may be edited between lookups).
+    """
+    if isinstance(stmt, Statement): return stmt.index
+    return MetricIndex([str(i) for i in stmt.index], stmt.to_numpy(dtype=np.float64))
+
+def find_row(stmt, keywords):
+    """First row whose label contains any of the keywords (case-insensitive) as a period-indexed Series, or None."""
+    if stmt.empty: return None
+    pos = metric_index(stmt).first(contains=keywords)
+    if pos is None: return None
+    return stmt.series(pos) if isinstance(stmt, Statement) else stmt.iloc[pos]
+
+def get_latest_value(stmt, keywords):
+    if stmt.empty: return 0.0
+    val = metric_index(stmt).latest_nonzero(keywords)
+    return 0.0 if val is None else val
 
+@instrument.timed()
 def get_current_ratio_fallback(datasets):
-    bs = datasets.get("BS", pd.DataFrame())
+    bs = datasets.get("BS", EMPTY)
     if bs.empty: return 0.0
     ca = get_latest_value(bs, ["Current Assets", "Total Current Assets"])
     cl = get_latest_value(bs, ["Current Liabilities", "Total Current Liabilities"])
     if cl > 0: return ca / cl
     return 0.0
 
+RATIO_TARGETS = {
+    "Inventory Turnover": ["Inventory Turnover"],
+    "Current Ratio": ["Current Ratio"],
+    "Quick Ratio": ["Quick Ratio"],
+    "AP Turnover": ["Trade Payables Turnover", "Creditors Turnover"]
+}
+
+@instrument.timed()
 def get_ratios_latest(datasets):
-    df = datasets.get("Ratios", pd.DataFrame())
+    stmt = datasets.get("Ratios", EMPTY)
     ratios = {}
-    target_map = {
-        "Inventory Turnover": ["Inventory Turnover"],
-        "Current Ratio": ["Current Ratio"],
-        "Quick Ratio": ["Quick Ratio"],
-        "AP Turnover": ["Trade Payables Turnover", "Creditors Turnover"]
-    }
-    for key, keywords in target_map.items():
-        ratios[key] = get_latest_value(df, keywords)
+    for key, keywords in RATIO_TARGETS.items():
+        ratios[key] = get_latest_value(stmt, keywords)
     return ratios
 
+def _trend_frame(stmt, rules):
+    """One column per rule that resolves, each a view of its statement row, indexed by period."""
+    index = stmt.index
+    rows = {}
+    for name, stages in rules.items():
+        pos = index.resolve(stages)
+        if pos is not None: rows[name] = stmt.row(pos)
+    return pd.DataFrame(rows, index=stmt.periods, copy=False)
+
+@instrument.timed()
 def get_trend_data_local(datasets):
     """
     Extracts P&L Trend with improved Profit Matching for Graphs.
     """
-    df = datasets.get("PL", pd.DataFrame())
-    if df.empty: return pd.DataFrame()
+    stmt = datasets.get("PL", EMPTY)
+    if stmt.empty: return pd.DataFrame()
     try:
-        df_t = df.T
-        trend = pd.DataFrame(index=df_t.index)
-        
-        # Revenue
-        for col in df_t.columns:
-            if "revenue from operations" in str(col).lower() or "total revenue" in str(col).lower():
-                trend["Revenue"] = df_t[col]
-                break
-                
-        # Net Profit (Smart Search)
-        found_profit = False
-        for col in df_t.columns:
-            c = str(col).lower()
-            if "profit for the period" in c or "profit for the year" in c or "net profit after tax" in c:
-                trend["Net Income"] = df_t[col]
-                found_profit = True
-                break
-        
-        if not found_profit:
-            for col in df_t.columns:
-                c = str(col).lower()
-                if "net profit" in c and "before" not in c:
-                    trend["Net Income"] = df_t[col]
-                    break
-        
-        # Fallback: Any "Profit" row that looks like bottom line
-        if "Net Income" not in trend.columns:
-             for col in df_t.columns:
-                c = str(col).lower()
-                if ("profit" in c or "loss" in c) and not any(x in c for x in ["before", "gross", "operating", "cash"]):
-                    trend["Net Income"] = df_t[col]
-                    break
-
-        return trend.apply(pd.to_numeric, errors='coerce')
+        return _trend_frame(stmt, TREND_RULES["PL"])
     except: return pd.DataFrame()
 
+@instrument.timed()
 def get_balance_sheet_trend(datasets):
     """
     Extracts Balance Sheet Trend for Graphs.
     """
-    df = datasets.get("BS", pd.DataFrame())
-    if df.empty: return pd.DataFrame()
+    stmt = datasets.get("BS", EMPTY)
+    if stmt.empty: return pd.DataFrame()
     try:
-        df_t = df.T
-        bs_trend = pd.DataFrame(index=df_t.index)
-        
-        # Assets
-        for col in df_t.columns:
-            if "Total Assets" in str(col) or "Equity & Liabilities" in str(col):
-                bs_trend["Total Assets"] = df_t[col]
-                break
-        
-        # Equity
-        for col in df_t.columns:
-            if "Total Equity" in str(col) or "Net Worth" in str(col) or str(col).strip() == "Equity":
-                bs_trend["Total Equity"] = df_t[col]
-                break
-                
-        # Liabilities
-        found_liab = False
-        for col in df_t.columns:
-            if "Total Liabilities" in str(col) or "Total Debt" in str(col):
-                bs_trend["Total Liabilities"] = df_t[col]
-                found_liab = True
-                break
-        
-        if not found_liab and "Total Assets" in bs_trend.columns and "Total Equity" in bs_trend.columns:
+        bs_trend = _trend_frame(stmt, TREND_RULES["BS"])
+        if "Total Liabilities" not in bs_trend.columns and "Total Assets" in bs_trend.columns and "Total Equity" in bs_trend.columns:
              bs_trend["Total Liabilities"] = bs_trend["Total Assets"] - bs_trend["Total Equity"]
-             
-        return bs_trend.apply(pd.to_numeric, errors='coerce')
+        return bs_trend
     except: return pd.DataFrame()
 
 # --- THIS FUNCTION WAS MISSING & IS NOW RESTORED ---
+@instrument.timed()
 def calculate_growth_metrics(datasets):
     """
     Calculates absolute and % growth for Revenue, Profit, Assets, Liabilities.
@@ -152,37 +385,28 @@ def calculate_growth_metrics(datasets):
     """
     growth = {}
     
-    def calc_change(df, keywords, exclude=[]):
-        if df.empty: return None
-        target_row = None
-        for idx in df.index:
-            s = str(idx).lower()
-            if any(k.lower() in s for k in keywords):
-                if not any(e.lower() in s for e in exclude):
-                    target_row = df.loc[idx]
-                    break
-        
-        if target_row is not None:
-            valid_vals = target_row[target_row != 0].dropna()
-            if len(valid_vals) >= 2:
-                s, e = valid_vals.iloc[0], valid_vals.iloc[-1]
-                return {"start": s, "end": e, "abs": e-s, "pct": ((e-s)/abs(s))*100, "years": len(valid_vals)}
+    def calc_change(name):
+        key, stage = GROWTH_RULES[name]
+        stmt = datasets.get(key, EMPTY)
+        if stmt.empty: return None
+        index = stmt.index
+        pos = index.first(**stage)
+        if pos is not None and index.count[pos] >= 2:
+            s, e = index.first_value[pos], index.latest_value[pos]
+            return {"start": s, "end": e, "abs": e-s, "pct": ((e-s)/abs(s))*100, "years": int(index.count[pos])}
         return None
 
-    pl = datasets.get("PL", pd.DataFrame())
-    bs = datasets.get("BS", pd.DataFrame())
-    
-    growth["Revenue"] = calc_change(pl, ["revenue", "sales"])
-    growth["Net Profit"] = calc_change(pl, ["profit", "loss"], exclude=["before", "gross", "operating", "cash"])
-    growth["Assets"] = calc_change(bs, ["total assets", "equity & liabilities"])
+    growth["Revenue"] = calc_change("Revenue")
+    growth["Net Profit"] = calc_change("Net Profit")
+    growth["Assets"] = calc_change("Assets")
     
     # Smart Liabilities Calculation
-    liab = calc_change(bs, ["total liabilities", "total debt"])
+    liab = calc_change("Liabilities")
     if not liab:
         # Try calculating from Assets - Equity
         try:
             a_growth = growth.get("Assets")
-            e_growth = calc_change(bs, ["total equity", "net worth"])
+            e_growth = calc_change("Equity")
             if a_growth and e_growth:
                 s = a_growth["start"] - e_growth["start"]
                 e = a_growth["end"] - e_growth["end"]
@@ -190,4 +414,48 @@ def calculate_growth_metrics(datasets):
         except: pass
     growth["Liabilities"] = liab
     
-    return growth
\ No newline at end of file
+    return growth
+
+@instrument.timed()
+def get_cash_flow_trend(datasets):
+    """
+    Cash Flow Trend: operating / investing / financing flows, capex, free cash
+    flow (operating + capex, capex is reported negative) and cash conversion
+    (operating cash flow / net income), for every year at once.
+    """
+    stmt = datasets.get("CF", EMPTY)
+    if stmt.empty: return pd.DataFrame()
+    try:
+        cf = _trend_frame(stmt, TREND_RULES["CF"])
+        if "Operating CF" not in cf.columns: return cf
+        ocf = cf["Operating CF"].to_numpy()
+        capex = cf["Capex"].to_numpy() if "Capex" in cf.columns else np.zeros(len(cf))
+        cf["Free Cash Flow"] = ocf + np.nan_to_num(capex)
+
+        pl = get_trend_data_local(datasets).reindex(cf.index)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if "Net Income" in pl.columns:
+                ni = pl["Net Income"].to_numpy()
+                cf["Cash Conversion"] = np.where(ni > 0, ocf / ni, np.nan)
+            if "Revenue" in pl.columns:
+                rev = pl["Revenue"].to_numpy()
+                cf["FCF Margin (%)"] = np.where(rev > 0, cf["Free Cash Flow"].to_numpy() / rev * 100, np.nan)
+        return cf
+    except: return pd.DataFrame()
+
+@instrument.timed()
+def get_cash_flow_metrics(cf_trend):
+    """Headline cash-flow numbers for the stat cards, from get_cash_flow_trend output."""
+    metrics = {"Latest FCF": 0.0, "Cumulative FCF": 0.0, "Avg Cash Conversion": 0.0, "Latest FCF Margin": 0.0}
+    if cf_trend.empty or "Free Cash Flow" not in cf_trend.columns: return metrics
+    fcf = cf_trend["Free Cash Flow"].to_numpy()
+    valid = ~np.isnan(fcf)
+    if valid.any():
+        metrics["Latest FCF"] = fcf[valid][-1]
+        metrics["Cumulative FCF"] = fcf[valid].sum()
+    for col, key, reduce in (("Cash Conversion", "Avg Cash Conversion", np.mean), ("FCF Margin (%)", "Latest FCF Margin", lambda a: a[-1])):
+        if col in cf_trend.columns:
+            vals = cf_trend[col].to_numpy()
+            vals = vals[np.isfinite(vals)]
+            if len(vals): metrics[key] = reduce(vals)
+    return metrics
\ No newline at end of file
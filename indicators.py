@@ -0,0 +1,146 @@
+import copy
+import math
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import market
+
+INDICATOR_COLS = ['MA_5', 'MA_20', 'RSI', 'BB_Upper', 'BB_Lower', 'Lag_1', 'Lag_2', 'Lag_5']
+
+class _RollingSum:
+    """Fixed-window running sum with Kahan compensation and periodic exact resync."""
+    RESYNC_EVERY = 1024
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.total = 0.0
+        self._comp = 0.0
+        self._ticks = 0
+
+    def _add(self, x):
+        y = x - self._comp
+        t = self.total + y
+        self._comp = (t - self.total) - y
+        self.total = t
+
+    def push(self, x):
+        if len(self.values) == self.window: self._add(-self.values[0])
+        self.values.append(x)
+        self._add(x)
+        self._ticks += 1
+        if self._ticks % self.RESYNC_EVERY == 0:
+            self.total, self._comp = math.fsum(self.values), 0.0
+
+    @property
+    def full(self):
+        return len(self.values) == self.window
+
+    def mean(self):
+        return self.total / self.window if self.full else np.nan
+
+class _RollingVar:
+    """Fixed-window sample variance (ddof=1) via Welford add/remove updates."""
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def push(self, x):
+        if len(self.values) == self.window:
+            old = self.values[0]
+            if self.n == 1: self.n, self.mean, self.m2 = 0, 0.0, 0.0
+            else:
+                prev = self.mean
+                self.n -= 1
+                self.mean -= (old - prev) / self.n
+                self.m2 -= (old - prev) * (old - self.mean)
+        self.values.append(x)
+        self.n += 1
+        prev = self.mean
+        self.mean += (x - prev) / self.n
+        self.m2 += (x - prev) * (x - self.mean)
+
+    def var(self):
+        if self.n < self.window: return np.nan
+        return max(self.m2, 0.0) / (self.n - 1)
+
+class IndicatorEngine:
+    """
+    Stateful version of market.add_technical_indicators.
+
+    Holds the last 20 closes plus running sums for MA_5/MA_20, a Welford
+    window for the Bollinger std and running gain/loss sums for RSI, so each
+    appended bar costs O(1). append() returns the indicator row for that bar,
+    or None while the windows are still warming up (the rows the batch
+    version drops with dropna()). Results match the batch version to
+    floating-point rounding.
+    """
+    def __init__(self):
+        self.ma5 = _RollingSum(5)
+        self.ma20 = _RollingSum(20)
+        self.std20 = _RollingVar(20)
+        self.gain = _RollingSum(14)
+        self.loss = _RollingSum(14)
+        self.closes = deque(maxlen=6)
+        self.last_row = None
+
+    def append(self, bar):
+        close = float(bar['Close'])
+        prev = self.closes[-1] if self.closes else None
+        # First bar has no delta; the batch version's where() turns that NaN into 0
+        delta = close - prev if prev is not None else 0.0
+        self.gain.push(delta if delta > 0 else 0.0)
+        self.loss.push(-delta if delta < 0 else 0.0)
+        self.ma5.push(close)
+        self.ma20.push(close)
+        self.std20.push(close)
+        self.closes.append(close)
+
+        if not (self.ma20.full and self.gain.full and len(self.closes) == 6): return None
+        gain, loss = self.gain.mean(), self.loss.mean()
+        if loss == 0:
+            if gain == 0: return None
+            rsi = 100.0
+        else: rsi = 100 - (100 / (1 + gain / loss))
+        ma20 = self.ma20.mean()
+        std = math.sqrt(self.std20.var())
+        row = dict(bar)
+        row.update({
+            'MA_5': self.ma5.mean(), 'MA_20': ma20, 'RSI': rsi,
+            'BB_Upper': ma20 + std * 2, 'BB_Lower': ma20 - std * 2,
+            'Lag_1': self.closes[-2], 'Lag_2': self.closes[-3], 'Lag_5': self.closes[0]
+        })
+        self.last_row = row
+        return row
+
+    def copy(self):
+        """Independent copy of the running state, e.g. to apply a provisional bar."""
+        other = copy.copy(self)
+        for name in ('ma5', 'ma20', 'std20', 'gain', 'loss'):
+            part = copy.copy(getattr(self, name))
+            part.values = part.values.copy()
+            setattr(other, name, part)
+        other.closes = self.closes.copy()
+        return other
+
+    def extend(self, df):
+        """Appends every bar of df; returns the completed indicator rows as a DataFrame."""
+        rows = [r for r in (self.append(bar) for bar in df.to_dict('records')) if r is not None]
+        return pd.DataFrame(rows, columns=list(df.columns) + INDICATOR_COLS)
+
+    @classmethod
+    def from_history(cls, df):
+        """
+        Cold start: the batch pandas computation for the full history, then
+        the engine is primed from the last 20 bars so later bars can be
+        appended incrementally. Returns (engine, indicator frame).
+        """
+        engine = cls()
+        data = market.add_technical_indicators(df)
+        for bar in df.tail(engine.ma20.window + 1).to_dict('records'): engine.append(bar)
+        return engine, data
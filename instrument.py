@@ -0,0 +1,128 @@
+"""
+Lightweight timing for the dashboard hot path.
+
+Public functions in market, financials, prediction and verdict are wrapped
+with @timed; main.py wraps its page stages in span(). While enabled, every
+call records wall time, call and error counts and the rows it returned;
+registered LRU caches contribute their hit/miss counters. Disabled (the
+default unless RSA_INSTRUMENT=1) a wrapped call costs one flag check.
+
+    instrument.enable()
+    ...
+    instrument.snapshot()        # dict, also to_json() / to_prometheus()
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+
+ENABLED = os.environ.get("RSA_INSTRUMENT", "0") not in ("", "0")
+_LOCK = threading.Lock()
+_STATS = {}
+_CACHES = {}
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+def reset():
+    with _LOCK: _STATS.clear()
+
+def count_rows(result):
+    """Rows in a DataFrame/Series result, the frames of a dict, or the first frame of a tuple."""
+    if isinstance(result, (pd.DataFrame, pd.Series)): return len(result)
+    if isinstance(result, dict): return sum(len(v) for v in result.values() if isinstance(v, (pd.DataFrame, pd.Series)))
+    if isinstance(result, tuple):
+        for v in result:
+            if isinstance(v, (pd.DataFrame, pd.Series)): return len(v)
+    return 0
+
+def record(name, seconds, rows=0, error=False):
+    with _LOCK:
+        s = _STATS.get(name)
+        if s is None: s = _STATS[name] = {"calls": 0, "errors": 0, "total_s": 0.0, "min_s": float('inf'), "max_s": 0.0, "last_s": 0.0, "rows": 0}
+        s["calls"] += 1
+        s["errors"] += bool(error)
+        s["total_s"] += seconds
+        s["min_s"] = min(s["min_s"], seconds)
+        s["max_s"] = max(s["max_s"], seconds)
+        s["last_s"] = seconds
+        s["rows"] += rows
+
+def timed(name=None, rows=count_rows):
+    """Decorator; name defaults to module.function."""
+    def wrap(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            if not ENABLED: return fn(*args, **kwargs)
+            t0 = time.perf_counter()
+            try: result = fn(*args, **kwargs)
+            except BaseException:
+                record(label, time.perf_counter() - t0, error=True)
+                raise
+            record(label, time.perf_counter() - t0, rows(result) if rows else 0)
+            return result
+        return inner
+    return wrap
+
+@contextmanager
+def span(name):
+    """Times a block of code under name (no-op while disabled)."""
+    if not ENABLED:
+        yield
+        return
+    t0 = time.perf_counter()
+    error = False
+    try: yield
+    except BaseException:
+        error = True
+        raise
+    finally: record(name, time.perf_counter() - t0, error=error)
+
+def watch_cache(name, lru):
+    """Reports a cache.LRUCache's hit/miss counters in every snapshot."""
+    _CACHES[name] = lru
+
+def snapshot():
+    with _LOCK: stats = {k: dict(v) for k, v in _STATS.items()}
+    for s in stats.values(): s["mean_s"] = s["total_s"] / s["calls"]
+    caches = {name: {"hits": lru.hits, "misses": lru.misses, "size": len(lru)} for name, lru in _CACHES.items()}
+    return {"enabled": ENABLED, "stages": stats, "caches": caches}
+
+def to_frame(snap=None):
+    """Stages as a DataFrame sorted by total time, for display."""
+    snap = snap or snapshot()
+    df = pd.DataFrame.from_dict(snap["stages"], orient="index")
+    if df.empty: return df
+    df.index.name = "Stage"
+    return df[["calls", "errors", "rows", "total_s", "mean_s", "min_s", "max_s", "last_s"]].sort_values("total_s", ascending=False)
+
+def to_json(snap=None):
+    return json.dumps(snap or snapshot(), indent=1)
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+def to_prometheus(snap=None):
+    """Prometheus text exposition format."""
+    snap = snap or snapshot()
+    lines = []
+    metrics = [
+        ("rsa_stage_calls_total", "counter", "Calls per instrumented stage", "calls"),
+        ("rsa_stage_errors_total", "counter", "Calls that raised", "errors"),
+        ("rsa_stage_seconds_total", "counter", "Wall time spent in the stage", "total_s"),
+        ("rsa_stage_seconds_max", "gauge", "Slowest single call", "max_s"),
+        ("rsa_stage_rows_total", "counter", "Rows returned by the stage", "rows"),
+    ]
+    for metric, kind, help_text, field in metrics:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{{stage="{_label(stage)}"}} {s[field]}' for stage, s in snap["stages"].items()]
+    for metric, field in (("rsa_cache_hits_total", "hits"), ("rsa_cache_misses_total", "misses")):
+        lines += [f"# HELP {metric} Cache {field}", f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{cache="{_label(name)}"}} {c[field]}' for name, c in snap["caches"].items()]
+    return "\n".join(lines) + "\n"
@@ -7,9 +7,14 @@ import base64
 import os
 
 # IMPORT LOCAL MODULES
+import companies
+import comparison
 import market
+import feed
 import financials
+import instrument
 import prediction
+import snapshot
 import verdict
 
 # --- 1. CONFIGURATION ---
@@ -47,19 +52,16 @@ st.markdown("""
 
 # --- 2. SIDEBAR ---
 st.sidebar.markdown("<h3 style='color:#10b981; font-size:13px; font-weight:700; margin-bottom:20px; letter-spacing:1px;'>TRADING DESK</h3>", unsafe_allow_html=True)
-cat = st.sidebar.radio("Market Segment", ["Large Cap", "Mid Cap", "Small Cap"])
-
-if cat == "Large Cap":
-    comp_map = {"DMart": {"ticker": "DMART.NS", "file": "Avenue Supermarts Ltd."}, "Titan": {"ticker": "TITAN.NS", "file": "Titan Company Ltd."}}
-elif cat == "Mid Cap":
-    comp_map = {"Kalyan Jewellers": {"ticker": "KALYANKJIL.NS", "file": "Kalyan Jewellers India Ltd."}, "Metro Brands": {"ticker": "METROBRAND.NS", "file": "Metro Brands Ltd."}}
-else:
-    comp_map = {"Ethos Ltd": {"ticker": "ETHOSLTD.NS", "file": "Ethos Ltd."}, "Arvind Fashions": {"ticker": "ARVINDFASN.NS", "file": "Arvind Fashions Ltd."}}
+cat = st.sidebar.radio("Market Segment", list(companies.SEGMENTS))
+comp_map = companies.SEGMENTS[cat]
 
 selected_label = st.sidebar.selectbox("Asset Class", list(comp_map.keys()))
 ticker = comp_map[selected_label]["ticker"]
 file_name = comp_map[selected_label]["file"]
 days_pred = st.sidebar.slider("Projection Window", 1, 30, 14)
+# Only shows the tab: recording is process-wide (RSA_INSTRUMENT), so one viewer can't switch it for everyone
+diagnostics = st.sidebar.toggle("Diagnostics", value=instrument.ENABLED, help="Show the DIAGNOSTICS tab (stage timings are recorded when RSA_INSTRUMENT=1)")
+instant = st.sidebar.toggle("Instant Start", value=os.environ.get("RSA_INSTANT", "1") != "0", help="Render from the precomputed snapshot (python snapshot.py) and refresh it in the background")
 
 def get_img_with_glow(filename):
     if os.path.exists(filename):
@@ -69,33 +71,53 @@ def get_img_with_glow(filename):
     return ""
 
 # --- 3. EXECUTION ---
-with st.spinner('Fetching Data...'):
-    df_market, info = market.fetch_history_data(ticker)
-    news_headlines = market.fetch_latest_news(ticker)
-    listing_price = market.get_listing_price(df_market)
-
-    # Local Data
-    local_data = financials.load_local_data(file_name)
-    trend_df = financials.get_trend_data_local(local_data)
-    bs_trend = financials.get_balance_sheet_trend(local_data)
-    efficiency_vals = financials.get_ratios_latest(local_data)
-    growth_data = financials.calculate_growth_metrics(local_data)
-    
-    curr_ratio = info.get('currentRatio', 0)
-    if curr_ratio is None or curr_ratio == 0:
-        curr_ratio = financials.get_current_ratio_fallback(local_data)
+snap_entry = snapshot.load(selected_label) if instant else None
+# An entry without a forecast (history too short or missing when it was built) renders live
+snap = snap_entry if snap_entry is not None and snap_entry["forecast"] and snap_entry["forecast"]["path"] else None
+
+if snap is not None:
+    df_market, info, news_headlines, listing_price = snap["prices"], snap["info"], snap["news"], snap["listing_price"]
+    trend_df, bs_trend, efficiency_vals, growth_data = snap["trend"], snap["bs_trend"], snap["ratios"], snap["growth"]
+    cf_trend, cf_metrics, curr_ratio = snap["cf_trend"], snap["cf_metrics"], snap["current_ratio"]
+    target, f_line, f_dates = snapshot.forecast(snap, days_pred)
+    fc = snap["forecast"]
+    metrics, reality, perf, model_name = fc["metrics"], fc["reality"], fc["perf"], fc["model"]
+    memo = snap["verdict"]
+else:
+    with st.spinner('Fetching Data...'):
+        with instrument.span("page.market"):
+            df_market, info, news_headlines = market.fetch_page(ticker)
+            listing_price = market.get_listing_price(df_market)
+
+        # Local Data
+        with instrument.span("page.financials"):
+            local_data = financials.load_local_data(file_name)
+            trend_df = financials.get_trend_data_local(local_data)
+            bs_trend = financials.get_balance_sheet_trend(local_data)
+            efficiency_vals = financials.get_ratios_latest(local_data)
+            growth_data = financials.calculate_growth_metrics(local_data)
+            cf_trend = financials.get_cash_flow_trend(local_data)
+            cf_metrics = financials.get_cash_flow_metrics(cf_trend)
+        
+        curr_ratio = info.get('currentRatio', 0)
+        if curr_ratio is None or curr_ratio == 0:
+            curr_ratio = financials.get_current_ratio_fallback(local_data)
 
 if not df_market.empty:
-    target, f_line, f_dates, metrics, reality, perf, model_name = prediction.run_ensemble_forecast(df_market, days_pred)
+    if snap is None:
+        with instrument.span("page.forecast"):
+            target, f_line, f_dates, metrics, reality, perf, model_name = prediction.run_ensemble_forecast(df_market, days_pred, ticker=ticker)
+        
+        with instrument.span("page.verdict"):
+            memo = verdict.generate_verdict(info, df_market, growth_data, efficiency_vals)
     init_price = df_market['Close'].iloc[-1]
-    
-    memo = verdict.generate_verdict(info, df_market, growth_data, efficiency_vals)
 
     # --- 4. HEADER ---
     @st.fragment(run_every=5) 
     def show_live_header_fragment():
-        live_price = market.fetch_realtime_price(ticker)
-        if live_price == 0.0: live_price = init_price
+        # From the snapshot, don't hold the first render for a network quote
+        quote = feed.get_feed().latest(ticker, wait=snap is None)
+        live_price = quote[0] if quote else init_price
         chg = live_price - df_market['Close'].iloc[-1]
         pct = (chg / df_market['Close'].iloc[-1]) * 100
         col = "#10b981" if chg >= 0 else "#ef4444"
@@ -118,7 +140,8 @@ if not df_market.empty:
     show_live_header_fragment()
     st.markdown("---")
     
-    t1, t2, t3, t4 = st.tabs(["CHART", "FINANCIALS", "FORECAST", "VERDICT"])
+    tabs = st.tabs(["CHART", "FINANCIALS", "FORECAST", "VERDICT", "COMPARE"] + (["DIAGNOSTICS"] if diagnostics else []))
+    t1, t2, t3, t4, t5 = tabs[:5]
 
     with t1:
         st.markdown("#### PRICE ACTION (6M)")
@@ -177,6 +200,22 @@ if not df_market.empty:
         e2.markdown(f"<div class='stat-box' style='border-left:3px solid #3b82f6'><div class='stat-label'>A/P TURNOVER</div><div class='stat-value'>{efficiency_vals.get('AP Turnover', 0):.2f}x</div></div>", unsafe_allow_html=True)
         e3.markdown(f"<div class='stat-box' style='border-left:3px solid #f59e0b'><div class='stat-label'>CURRENT RATIO</div><div class='stat-value'>{efficiency_vals.get('Current Ratio', 0):.2f}</div></div>", unsafe_allow_html=True)
 
+        st.markdown("#### CASH FLOW")
+        if not cf_trend.empty and "Operating CF" in cf_trend.columns:
+            f1, f2, f3 = st.columns(3)
+            f1.markdown(f"<div class='stat-box' style='border-left:3px solid #10b981'><div class='stat-label'>FREE CASH FLOW (LATEST)</div><div class='stat-value'>₹{cf_metrics['Latest FCF']:,.0f} Cr</div></div>", unsafe_allow_html=True)
+            f2.markdown(f"<div class='stat-box' style='border-left:3px solid #10b981'><div class='stat-label'>CASH CONVERSION (AVG OCF / PAT)</div><div class='stat-value'>{cf_metrics['Avg Cash Conversion']:.2f}x</div></div>", unsafe_allow_html=True)
+            f3.markdown(f"<div class='stat-box' style='border-left:3px solid #10b981'><div class='stat-label'>FCF MARGIN (LATEST)</div><div class='stat-value'>{cf_metrics['Latest FCF Margin']:.1f}%</div></div>", unsafe_allow_html=True)
+
+            flows = [c for c in ["Operating CF", "Investing CF", "Financing CF"] if c in cf_trend.columns]
+            fig_cf = go.Figure()
+            for name, color in zip(flows, ['#3b82f6', '#f59e0b', '#a855f7']):
+                fig_cf.add_trace(go.Bar(x=cf_trend.index, y=cf_trend[name], name=name, marker_color=color))
+            fig_cf.add_trace(go.Scatter(x=cf_trend.index, y=cf_trend["Free Cash Flow"], name="Free Cash Flow", line=dict(color='#10b981', width=3)))
+            fig_cf.update_layout(barmode="group", template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", height=300, margin=dict(l=0,r=0,t=0,b=0))
+            st.plotly_chart(fig_cf, use_container_width=True)
+        else: st.info("No Cash Flow Data")
+
     with t3:
         st.markdown(f"#### SELECTED MODEL: <span style='color:#10b981'>{model_name.upper()}</span>", unsafe_allow_html=True)
         c1, c2, c3 = st.columns(3)
@@ -196,6 +235,8 @@ if not df_market.empty:
              fig_hm = px.imshow(perf[['RMSE', 'MAE', 'MAPE (%)']], text_auto=".2f", aspect="auto", color_continuous_scale="RdYlGn_r", height=200)
              fig_hm.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", margin=dict(l=0,r=0,t=0,b=0))
              st.plotly_chart(fig_hm, use_container_width=True)
+             cost = [c for c in prediction.COST_COLS if c in perf]
+             if cost: st.dataframe(perf[cost].style.format("{:.3f}"), use_container_width=True)
 
         # --- RESTORED REALITY CHECK SECTION ---
         st.markdown("#### REALITY CHECK (PREDICTION VS ACTUAL)")
@@ -218,6 +259,8 @@ if not df_market.empty:
                         </div>
                         """, unsafe_allow_html=True)
                     idx += 1
+            if metrics.get('WF Origins'):
+                st.caption(f"Walk-forward backtest over {metrics['WF Origins']} daily origins: RMSE {metrics['WF RMSE']:.2f} | MAE {metrics['WF MAE']:.2f} | MAPE {metrics['WF MAPE']:.2f}%")
 
     with t4:
         v_col = memo['Color']
@@ -238,4 +281,44 @@ if not df_market.empty:
         with i2:
             st.markdown(get_img_with_glow("Product_Category.png"), unsafe_allow_html=True)
 
-else: st.error("Connection Error: Unable to fetch market data.")
\ No newline at end of file
+    with t5:
+        universe = companies.all_companies()
+        k1, k2, k3 = st.columns([3, 1, 1])
+        picked = k1.multiselect("Companies", list(universe), default=list(comp_map))
+        period = k2.selectbox("Period", list(comparison.PERIODS), index=3)
+        # Streamlit runs every tab body on each rerun; only fetch the histories once asked to
+        show_cmp = k3.toggle("Load chart", value=False, help="Fetch the selected histories and plot them")
+        if not show_cmp: st.info("Turn on Load chart to compare the selected companies")
+        elif picked:
+            with instrument.span("page.compare"):
+                cmp = comparison.payload([universe[label]["ticker"] for label in picked], comparison.CHART_WIDTH, comparison.PERIODS[period])
+            st.markdown(f"#### NORMALIZED RETURNS ({period})")
+            fig_cmp = go.Figure()
+            names = {universe[label]["ticker"]: label for label in picked}
+            for t, line in cmp["series"].items():
+                fig_cmp.add_trace(go.Scattergl(x=line["x"], y=line["y"], name=names.get(t, t), mode="lines"))
+            fig_cmp.update_layout(template="plotly_dark", paper_bgcolor="rgba(0,0,0,0)", height=450, yaxis_ticksuffix="%", margin=dict(l=0,r=0,t=0,b=0))
+            st.plotly_chart(fig_cmp, use_container_width=True)
+            st.caption(f"{cmp['points']:,} of {cmp['raw_points']:,} daily points plotted (LTTB)")
+        else: st.info("Select companies to compare")
+
+    if diagnostics:
+        with tabs[5]:
+            diag = instrument.snapshot()
+            if not diag["enabled"]: st.warning("Stage recording is off for this process; start it with RSA_INSTRUMENT=1")
+            st.markdown("#### STAGE TIMINGS (THIS PROCESS)")
+            stages = instrument.to_frame(diag)
+            if not stages.empty: st.dataframe(stages.style.format({c: "{:.4f}" for c in stages.columns if c.endswith("_s")}), use_container_width=True)
+            else: st.info("No stages recorded yet")
+            st.markdown("#### CACHES")
+            st.dataframe(pd.DataFrame.from_dict(diag["caches"], orient="index"), use_container_width=True)
+            d1, d2, d3 = st.columns(3)
+            d1.download_button("Export JSON", instrument.to_json(diag), file_name="diagnostics.json", mime="application/json")
+            d2.download_button("Export Prometheus", instrument.to_prometheus(diag), file_name="metrics.prom", mime="text/plain")
+            # Counters are shared by every session; only an admin deployment (RSA_INSTRUMENT_ADMIN=1) may wipe them
+            if os.environ.get("RSA_INSTRUMENT_ADMIN", "0") not in ("", "0") and d3.button("Reset counters"): instrument.reset()
+
+else: st.error("Connection Error: Unable to fetch market data.")
+
+# Rebuild a missing or stale snapshot after this page has rendered
+if instant and snapshot.is_stale(snap_entry): snapshot.refresh_async()
\ No newline at end of file
@@ -1,30 +1,49 @@
-import yfinance as yf
 import pandas as pd
 import numpy as np
+import store
+import instrument
 
+# Network calls go through the shared marketdata client (per-endpoint
+# timeouts and TTL caches); these wrappers keep the synchronous API. The
+# client (and asyncio) is imported on first use, like yfinance before it.
+def _client():
+    import marketdata
+    return marketdata.get_client()
+
+@instrument.timed()
 def fetch_realtime_price(ticker):
-    try: return yf.Ticker(ticker).fast_info['last_price']
-    except: return 0.0
+    return _client().fetch_sync("price", ticker)
 
-def fetch_history_data(ticker):
+@instrument.timed()
+def fetch_history_data(ticker, start=None, end=None):
+    """
+    Full daily history (max period, to find the IPO price) and stock.info,
+    served from the local OHLCV store. The store is seeded from bundled CSV
+    dumps and only fetches bars after its last stored date. History and info
+    are fetched concurrently.
+    """
     try:
-        stock = yf.Ticker(ticker)
-        # Fetch max history to find IPO price
-        hist = stock.history(period="max", interval="1d")
-        if not hist.empty:
-            hist.index = hist.index.tz_localize(None)
-            hist.reset_index(inplace=True)
-        return hist, stock.info
+        if start is not None or end is not None: return store.history(ticker, start, end), store.info(ticker)
+        return _client().page_sync(ticker, ("history", "info"))
     except: return pd.DataFrame(), {}
 
+@instrument.timed()
 def fetch_latest_news(ticker):
-    try:
-        stock = yf.Ticker(ticker)
-        news_list = stock.news
-        if not news_list: return "NO LIVE NEWS AVAILABLE."
-        headlines = [item['title'].upper() for item in news_list[:5]]
-        return "  +++  ".join(headlines)
-    except: return "NEWS FEED OFFLINE"
+    return _client().fetch_sync("news", ticker)
+
+@instrument.timed()
+def fetch_page(ticker):
+    """(history, info, news headline string) in one concurrent round trip."""
+    return _client().page_sync(ticker)
+
+@instrument.timed()
+def fetch_histories(tickers):
+    """{ticker: history} for several tickers, fetched concurrently."""
+    return _client().many_sync("history", tickers)
+
+def date_ordinals(dates):
+    """Vectorized Timestamp.toordinal() for a datetime column."""
+    return pd.to_datetime(dates).to_numpy().astype('datetime64[D]').astype(np.int64) + store.EPOCH_ORDINAL
 
 def get_listing_price(df):
     if not df.empty:
@@ -32,31 +51,53 @@ def get_listing_price(df):
     return 0.0
 
 # --- THIS WAS MISSING ---
-def add_technical_indicators(df):
+@instrument.timed()
+def add_technical_indicators(df, by=None):
     """
-    Calculates technical indicators needed for prediction.py
+    Calculates technical indicators needed for prediction.py.
+    With by (a column name) df holds several tickers stacked on a unique
+    index; windows, diffs and lags restart at every group, in one pass.
     """
     data = df.copy()
+    keys = None if by is None else data[by]
+
+    def roll(s, window):
+        if keys is None: return s.rolling(window=window)
+        return _GroupRolling(s.groupby(keys, sort=False).rolling(window=window))
+
+    def shift(s, k):
+        return s.shift(k) if keys is None else s.groupby(keys, sort=False).shift(k)
     
     # Moving Averages
-    data['MA_5'] = data['Close'].rolling(window=5).mean()
-    data['MA_20'] = data['Close'].rolling(window=20).mean()
+    data['MA_5'] = roll(data['Close'], 5).mean()
+    data['MA_20'] = roll(data['Close'], 20).mean()
     
     # RSI
-    delta = data['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    delta = data['Close'].diff() if keys is None else data['Close'].groupby(keys, sort=False).diff()
+    gain = roll(delta.where(delta > 0, 0), 14).mean()
+    loss = roll(-delta.where(delta < 0, 0), 14).mean()
     rs = gain / loss
     data['RSI'] = 100 - (100 / (1 + rs))
     
     # Bollinger Bands
-    std_dev = data['Close'].rolling(20).std()
+    std_dev = roll(data['Close'], 20).std()
     data['BB_Upper'] = data['MA_20'] + (std_dev * 2)
     data['BB_Lower'] = data['MA_20'] - (std_dev * 2)
     
     # Lags for AI Features
-    data['Lag_1'] = data['Close'].shift(1)
-    data['Lag_2'] = data['Close'].shift(2)
-    data['Lag_5'] = data['Close'].shift(5)
+    data['Lag_1'] = shift(data['Close'], 1)
+    data['Lag_2'] = shift(data['Close'], 2)
+    data['Lag_5'] = shift(data['Close'], 5)
     
-    return data.dropna()
\ No newline at end of file
+    return data.dropna()
+
+class _GroupRolling:
+    """groupby().rolling() with the group level dropped, so results align with the stacked frame."""
+    def __init__(self, rolling):
+        self.rolling = rolling
+
+    def mean(self):
+        return self.rolling.mean().droplevel(0)
+
+    def std(self):
+        return self.rolling.std().droplevel(0)
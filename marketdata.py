@@ -0,0 +1,194 @@
+"""
+Asynchronous market-data client.
+
+History, info, news and the realtime price are fetched concurrently on one
+event loop, each endpoint with its own timeout and TTL cache, so a page
+waits for the slowest call instead of the sum of all of them. The loop runs
+in a daemon thread shared by every Streamlit session; blocking yfinance
+calls go to a bounded thread pool and reuse one yf.Ticker per symbol (and
+with it yfinance's process-wide HTTP session and cookie/crumb).
+
+    client = marketdata.get_client()
+    df, info, news = client.page_sync("DMART.NS")
+    data = await client.page("DMART.NS")      # {"history", "info", "news"}, from async code
+
+Sources are swappable like feed.py's quote sources: YahooSource is the live
+one, LocalSource serves the OHLCV store only and never touches the network.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import cache
+import instrument
+import store
+
+# endpoint: (timeout seconds, TTL seconds, value returned on failure or timeout)
+ENDPOINTS = {
+    "history": (float(os.environ.get("RSA_HISTORY_TIMEOUT", 20)), 60, None),
+    "info": (float(os.environ.get("RSA_INFO_TIMEOUT", 10)), 6 * 3600, {}),
+    "news": (float(os.environ.get("RSA_NEWS_TIMEOUT", 5)), 10 * 60, "NEWS FEED OFFLINE"),
+    "price": (float(os.environ.get("RSA_PRICE_TIMEOUT", 3)), 5, 0.0)
+}
+
+# What a dashboard page needs, in page_sync() order
+PAGE = ("history", "info", "news")
+
+def format_news(news_list):
+    if not news_list: return "NO LIVE NEWS AVAILABLE."
+    return "  +++  ".join(item['title'].upper() for item in news_list[:5])
+
+class YahooSource:
+    """
+    Live endpoints. History and info go through the store (incremental sync,
+    info in the meta file). ticker_factory builds the per-symbol object
+    (yf.Ticker by default; tests pass one backed by a local server).
+    """
+    def __init__(self, ticker_factory=None):
+        self.ticker_factory = ticker_factory
+        self._tickers = {}
+        self._lock = threading.Lock()
+
+    def ticker(self, symbol):
+        with self._lock:
+            t = self._tickers.get(symbol)
+            if t is None:
+                factory = self.ticker_factory
+                if factory is None:
+                    import yfinance as yf
+                    factory = yf.Ticker
+                t = self._tickers[symbol] = factory(symbol)
+            return t
+
+    def _download(self, symbol, start):
+        stock = self.ticker(symbol)
+        hist = stock.history(start=start, interval="1d") if start else stock.history(period="max", interval="1d")
+        if hist.empty: return hist
+        hist.index = hist.index.tz_localize(None)
+        return hist.reset_index()
+
+    def history(self, symbol):
+        store.seed(symbol)
+        store.sync(symbol, download=self._download)
+        return store.history(symbol, sync_now=False)
+
+    def info(self, symbol):
+        return store.info(symbol, fetch=lambda s: self.ticker(s).info)
+
+    def news(self, symbol):
+        return format_news(self.ticker(symbol).news)
+
+    def price(self, symbol):
+        return float(self.ticker(symbol).fast_info['last_price'])
+
+class LocalSource:
+    """Offline: store history (seeded from the CSV dumps, no sync), stored info, last close as the price."""
+    def history(self, symbol):
+        store.seed(symbol)
+        return store.history(symbol, sync_now=False)
+
+    def info(self, symbol):
+        return store.read_meta(symbol).get("info", {})
+
+    def news(self, symbol):
+        return "NO LIVE NEWS AVAILABLE."
+
+    def price(self, symbol):
+        arr = store.window(symbol)
+        if arr is None or not len(arr): raise KeyError(symbol)
+        return float(arr[-1, 4])
+
+class MarketDataClient:
+    """
+    One event loop thread plus a pool of max_workers threads for the
+    blocking source calls. Every endpoint call is cached for its TTL and
+    abandoned after its timeout (the endpoint's fallback is returned; a late
+    result still fills the cache for the next caller). Concurrent requests
+    for the same endpoint and ticker share one upstream call.
+    """
+    def __init__(self, source=None, endpoints=None, max_workers=8):
+        self.source = YahooSource() if source is None else source
+        self.endpoints = dict(ENDPOINTS, **(endpoints or {}))
+        self.caches = {name: cache.TTLCache(ttl, maxsize=64) for name, (_, ttl, _) in self.endpoints.items()}
+        self.upstream_calls = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="marketdata")
+        self._inflight = {}
+        self._loop = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="marketdata-loop", daemon=True).start()
+            return self._loop
+
+    def _call(self, endpoint, symbol):
+        value = getattr(self.source, endpoint)(symbol)
+        # an empty frame or info dict means the upstream had nothing; ask again next time
+        if not (isinstance(value, (dict, pd.DataFrame)) and len(value) == 0): self.caches[endpoint].put(symbol, value)
+        return value
+
+    async def fetch(self, endpoint, symbol):
+        """One endpoint for one ticker: cache, then a shared in-flight call, bounded by the endpoint timeout."""
+        value = self.caches[endpoint].get(symbol)
+        if value is not None: return value
+        timeout, _, fallback = self.endpoints[endpoint]
+        loop = asyncio.get_running_loop()
+        key = (endpoint, symbol)
+        pending = self._inflight.get(key)
+        if pending is None or pending.get_loop() is not loop:
+            self.upstream_calls += 1
+            pending = self._inflight[key] = loop.run_in_executor(self._pool, self._call, endpoint, symbol)
+            pending.add_done_callback(lambda f: self._inflight.pop(key, None) if self._inflight.get(key) is f else None)
+        try: return await asyncio.wait_for(asyncio.shield(pending), timeout)
+        except Exception: return fallback
+
+    async def page(self, symbol, endpoints=PAGE):
+        """{endpoint: value} for several endpoints of one ticker, fetched concurrently."""
+        values = await asyncio.gather(*(self.fetch(e, symbol) for e in endpoints))
+        out = dict(zip(endpoints, values))
+        if "history" in out and out["history"] is None: out["history"] = pd.DataFrame()
+        return out
+
+    async def many(self, endpoint, symbols):
+        """{symbol: value} for one endpoint across tickers, fetched concurrently."""
+        values = await asyncio.gather(*(self.fetch(endpoint, s) for s in symbols))
+        if endpoint == "history": values = [pd.DataFrame() if v is None else v for v in values]
+        return dict(zip(symbols, values))
+
+    def run(self, coro):
+        """Runs a coroutine on the client's loop and blocks for its result (synchronous callers)."""
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def page_sync(self, symbol, endpoints=PAGE):
+        """The page() values as a tuple in endpoint order, for synchronous callers."""
+        page = self.run(self.page(symbol, endpoints))
+        return tuple(page[e] for e in endpoints)
+
+    def fetch_sync(self, endpoint, symbol):
+        return self.run(self.fetch(endpoint, symbol))
+
+    def many_sync(self, endpoint, symbols):
+        return self.run(self.many(endpoint, list(symbols)))
+
+    def close(self):
+        with self._lock:
+            if self._loop is not None: self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+        self._pool.shutdown(wait=False)
+
+_client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Process-wide client (RSA_MARKETDATA=local for the offline source)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = MarketDataClient(LocalSource() if os.environ.get("RSA_MARKETDATA") == "local" else None)
+            for name, lru in _client.caches.items(): instrument.watch_cache(f"marketdata.{name}", lru)
+        return _client
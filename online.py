@@ -0,0 +1,137 @@
+"""
+Online forecaster for live updates.
+
+A ridge regression over prediction.FEATURE_COLS kept current with recursive
+least squares: each new bar goes through indicators.IndicatorEngine and one
+Sherman-Morrison update of the inverse Gram matrix (O(features^2)), and the
+refreshed coefficients drive the same recursion prediction.RecursiveForecaster
+uses (the model can also be handed to it directly). No sklearn model is refit, so a new bar or live quote turns into a new
+forecast in microseconds.
+
+    fc = OnlineForecaster.from_history(df)
+    fc.update(bar)                 # new daily bar (dict with Date/OHLCV)
+    fc.forecast(30)                # (prices, dates)
+    fc.nowcast(price, 30)          # provisional: live price as today's close
+"""
+import numpy as np
+import pandas as pd
+
+import indicators
+import market
+import prediction
+
+class OnlineForecaster:
+    """
+    RLS ridge on standardized features plus an intercept. Features are scaled
+    with the mean/std of the history it was built from (kept fixed so the
+    recursion stays exact); alpha penalizes the scaled coefficients, the
+    intercept is effectively unpenalized. forget < 1 discounts old bars
+    exponentially (1.0 = every bar counts equally, i.e. a growing-window
+    ridge fit).
+    """
+    is_linear = True
+
+    def __init__(self, engine, mean, scale, P, w, forget=1.0):
+        self.engine = engine
+        self.mean = mean
+        self.scale = scale
+        self.P = P
+        self.w = w
+        self.forget = forget
+        self.updates = 0
+
+    @classmethod
+    def from_history(cls, df, alpha=1.0, forget=1.0):
+        engine, data = indicators.IndicatorEngine.from_history(df)
+        data['Date_Ord'] = market.date_ordinals(data['Date'])
+        X = data[prediction.FEATURE_COLS].to_numpy(dtype=np.float64)
+        y = data['Close'].to_numpy(dtype=np.float64)
+        mean, scale = X.mean(axis=0), X.std(axis=0)
+        scale[scale == 0] = 1.0
+        Z = np.column_stack([(X - mean) / scale, np.ones(len(X))])
+        penalty = np.full(Z.shape[1], float(alpha))
+        penalty[-1] = 1e-8
+        P = np.linalg.inv(Z.T @ Z + np.diag(penalty))
+        return cls(engine, mean, scale, P, P @ (Z.T @ y), forget)
+
+    def _z(self, x):
+        z = np.empty(len(x) + 1)
+        z[:-1] = (x - self.mean) / self.scale
+        z[-1] = 1.0
+        return z
+
+    @staticmethod
+    def features(row):
+        """Raw FEATURE_COLS vector for an indicator row from the engine."""
+        row = dict(row)
+        row['Date_Ord'] = pd.Timestamp(row['Date']).toordinal()
+        return np.array([row[c] for c in prediction.FEATURE_COLS], dtype=np.float64)
+
+    def predict_row(self, x):
+        return float(self._z(x) @ self.w)
+
+    def learn(self, x, y):
+        """One RLS step on raw features x and target y."""
+        z = self._z(x)
+        Pz = self.P @ z
+        gain = Pz / (self.forget + z @ Pz)
+        self.w += gain * (y - z @ self.w)
+        self.P -= np.outer(gain, Pz)
+        if self.forget != 1.0: self.P /= self.forget
+        self.updates += 1
+
+    def update(self, bar):
+        """
+        Appends a completed bar. Returns the one-step prediction the model made
+        for it before learning from it (None while the engine warms up).
+        """
+        row = self.engine.append(bar)
+        if row is None: return None
+        x = self.features(row)
+        pred = self.predict_row(x)
+        self.learn(x, float(row['Close']))
+        return pred
+
+    @property
+    def coef_(self):
+        return self.w[:-1] / self.scale
+
+    @property
+    def intercept_(self):
+        return float(self.w[-1] - (self.w[:-1] / self.scale) @ self.mean)
+
+    def forecast(self, days, last_row=None):
+        """
+        (prices, dates) for `days` ahead from the latest bar (or last_row).
+
+        Same recursion as prediction.RecursiveForecaster (lags read from the
+        path buffer, MA_5 advanced, other indicators held), written as a
+        scalar loop: with one scenario and nine coefficients plain floats beat
+        per-step array calls. dates is a datetime64[D] array.
+        """
+        row = last_row or self.engine.last_row
+        coef = dict(zip(prediction.FEATURE_COLS, self.coef_.tolist()))
+        held = self.intercept_ + sum(coef[c] * row[c] for c in ('MA_20', 'RSI', 'BB_Upper', 'BB_Lower'))
+        start = np.datetime64(pd.Timestamp(row['Date']).date(), 'D')
+        ordinal = float(pd.Timestamp(row['Date']).toordinal())
+        ma5 = row['MA_5']
+        path = [row['Lag_5'], row['Lag_1'], row['Close']]
+        c_ord, c_ma5, c_l1, c_l2, c_l5 = coef['Date_Ord'], coef['MA_5'], coef['Lag_1'], coef['Lag_2'], coef['Lag_5']
+        for i in range(days):
+            ordinal += 1
+            pred = held + c_ord * ordinal + c_ma5 * ma5 + c_l1 * path[i + 2] + c_l2 * path[i + 1] + c_l5 * path[i]
+            path.append(pred)
+            ma5 = (ma5 * 4 + pred) / 5
+        return path[3:], start + np.arange(1, days + 1)
+
+    def nowcast(self, price, days, date=None):
+        """
+        Forecast with a live price standing in for today's close. The bar is
+        applied to a copy of the indicator state, so nothing is learned.
+        """
+        engine = self.engine.copy()
+        last = engine.last_row
+        bar = {'Date': date if date is not None else pd.Timestamp(last['Date']) + pd.Timedelta(days=1),
+               'Open': price, 'High': price, 'Low': price, 'Close': price, 'Volume': 0}
+        row = engine.append(bar)
+        return self.forecast(days, row or last)
@@ -1,99 +1,494 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
-from sklearn.linear_model import Ridge
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
-from datetime import timedelta
+import os
+import pickle
+import glob
+import hashlib
+import importlib
+import contextlib
+import time
 import market 
+import cache
+import instrument
 
-def run_ensemble_forecast(df, days=30):
-    if len(df) < 100: return 0.0, [], [], {}, {}, pd.DataFrame(), "Insufficient Data"
-    
+# sklearn, joblib and backtest (which needs both) are imported inside the
+# functions that use them, so importing this module stays cheap for pages
+# that render from the snapshot or never reach the FORECAST tab.
+
+class LazyEstimator:
+    """Stands in for an sklearn estimator class in the spec tables until the first instance is built."""
+    def __init__(self, module, name):
+        self.module = module
+        self.__name__ = name
+
+    def resolve(self):
+        return getattr(importlib.import_module(self.module), self.__name__)
+
+    def __call__(self, **params):
+        return self.resolve()(**params)
+
+Ridge = LazyEstimator("sklearn.linear_model", "Ridge")
+RandomForestRegressor = LazyEstimator("sklearn.ensemble", "RandomForestRegressor")
+GradientBoostingRegressor = LazyEstimator("sklearn.ensemble", "GradientBoostingRegressor")
+HistGradientBoostingRegressor = LazyEstimator("sklearn.ensemble", "HistGradientBoostingRegressor")
+
+FEATURE_COLS = ['Date_Ord', 'MA_5', 'MA_20', 'RSI', 'BB_Upper', 'BB_Lower', 'Lag_1', 'Lag_2', 'Lag_5']
+
+# Every model the ensemble can pick from: (forecast spec, backtest spec).
+# "Hist Gradient Boosting" bins features into 255 buckets and fits in a
+# fraction of the time; "Compact Forest" caps leaves per tree, so its pickle
+# stays at a few MB instead of ~50 MB for the depth-15 forest.
+MODEL_BACKENDS = {
+    "Ridge Regression": ((Ridge, {"alpha": 1.0}), (Ridge, {"alpha": 1.0})),
+    "Random Forest": ((RandomForestRegressor, {"n_estimators": 300, "max_depth": 15, "random_state": 42}),
+                      (RandomForestRegressor, {"n_estimators": 150, "max_depth": 10, "random_state": 42})),
+    "Gradient Boosting": ((GradientBoostingRegressor, {"n_estimators": 300, "learning_rate": 0.05, "max_depth": 4, "random_state": 42}),
+                          (GradientBoostingRegressor, {"n_estimators": 150, "max_depth": 3, "learning_rate": 0.05, "random_state": 42})),
+    "Hist Gradient Boosting": ((HistGradientBoostingRegressor, {"max_iter": 300, "learning_rate": 0.05, "max_leaf_nodes": 15, "early_stopping": False, "random_state": 42}),
+                               (HistGradientBoostingRegressor, {"max_iter": 150, "learning_rate": 0.05, "max_leaf_nodes": 15, "early_stopping": False, "random_state": 42})),
+    "Compact Forest": ((RandomForestRegressor, {"n_estimators": 100, "max_leaf_nodes": 256, "min_samples_leaf": 2, "random_state": 42}),
+                       (RandomForestRegressor, {"n_estimators": 100, "max_leaf_nodes": 256, "min_samples_leaf": 2, "random_state": 42}))
+}
+
+# Candidates in selection order, e.g. RSA_FORECAST_MODELS="Ridge Regression,Hist Gradient Boosting,Compact Forest"
+MODELS = [m.strip() for m in (os.environ.get("RSA_FORECAST_MODELS") or "Ridge Regression,Random Forest,Gradient Boosting").split(",") if m.strip()]
+_unknown = [m for m in MODELS if m not in MODEL_BACKENDS]
+if _unknown or not MODELS:
+    raise ValueError(f"RSA_FORECAST_MODELS: unknown model(s) {_unknown}; choose from {list(MODEL_BACKENDS)}")
+MODEL_SPECS = {name: MODEL_BACKENDS[name][0] for name in MODELS}
+BACKTEST_SPECS = {name: MODEL_BACKENDS[name][1] for name in MODELS}
+
+# Selection budgets: the lowest-RMSE candidate whose single-row predict
+# latency (ms), pickled size (MB) and fit CPU time (s) are all within budget.
+# None = unbounded; if nothing fits, the cheapest candidate to predict wins.
+def _env_float(name):
+    value = os.environ.get(name)
+    return float(value) if value else None
+
+BUDGET = {"Predict (ms)": _env_float("RSA_PREDICT_BUDGET_MS"), "Size (MB)": _env_float("RSA_SIZE_BUDGET_MB"), "Fit (s)": _env_float("RSA_FIT_BUDGET_S")}
+COST_COLS = ["Fit (s)", "Predict (ms)", "Size (MB)"]
+
+# Walk-forward backtest of the selected model (see backtest.walk_forward).
+# Ridge is refit exactly at every origin; tree models every refit_every origins.
+# One refit cycle per block splits the 250 origins into 5 blocks for n_jobs workers.
+WALK_FORWARD = {"origins": 250, "window": "expanding", "refit_every": 60, "warm_trees": 10, "block_size": 60}
+
+MODEL_REGISTRY = cache.LRUCache(maxsize=8)
+# Registry pickles kept on disk per ticker; older ones (earlier last bars) are deleted on store
+REGISTRY_KEEP = int(os.environ.get("RSA_REGISTRY_KEEP", 2))
+instrument.watch_cache("model_registry", MODEL_REGISTRY)
+
+# Worker count / joblib backend for training. 1 = serial, -1 = all cores.
+N_JOBS = int(os.environ.get("RSA_FORECAST_JOBS", 1))
+BACKEND = os.environ.get("RSA_FORECAST_BACKEND", "loky")
+
+def _build(specs, name):
+    cls, params = specs[name]
+    return cls(**params)
+
+def model_specs(ticker=None):
+    """
+    (model specs, backtest specs) for a ticker. Once tuning.py has stored
+    hyperparameters for it, both use the tuned settings, so the backtest
+    scores the model that is actually forecasting; otherwise the defaults.
+    """
+    if ticker is None: return MODEL_SPECS, BACKTEST_SPECS
+    import tuning
+    tuned = tuning.load(ticker)
+    if not tuned: return MODEL_SPECS, BACKTEST_SPECS
+    specs = {name: (cls, {**params, **tuned.get(name, {})}) for name, (cls, params) in MODEL_SPECS.items()}
+    return specs, specs
+
+def registry_key(ticker, df, specs=None):
+    """
+    (ticker, last bar date, rows, feature set, hyperparameters). Anything that
+    changes the fitted models changes the key; the projection window does not.
+    """
+    specs = specs or model_specs(ticker)
+    specs = repr([(name, cls.__name__, sorted(params.items()))
+                  for group in specs for name, (cls, params) in group.items()] + sorted(WALK_FORWARD.items())
+                 + sorted((k, v) for k, v in BUDGET.items() if v is not None))
+    return (ticker, str(pd.Timestamp(df['Date'].iloc[-1]).date()), len(df), tuple(FEATURE_COLS), specs)
+
+def _registry_file(key):
+    """.cache/models/<ticker>-<key hash>.pkl"""
+    return cache.cache_path("models", f"{key[0]}-{hashlib.sha1(repr(key).encode()).hexdigest()}.pkl")
+
+def _prune_registry(ticker, keep=None):
+    """
+    Deletes all but the `keep` newest registry files of ticker, plus any
+    unprefixed <hash>.pkl left by the old naming, which is never read now.
+    """
+    keep = REGISTRY_KEEP if keep is None else keep
+    folder = glob.escape(os.path.dirname(cache.cache_path("models", "x")))
+    files = sorted(glob.glob(os.path.join(folder, f"{glob.escape(ticker)}-*.pkl")), key=os.path.getmtime, reverse=True)
+    legacy = glob.glob(os.path.join(folder, "[0-9a-f]" * 40 + ".pkl"))
+    for path in files[keep:] + legacy:
+        try: os.remove(path)
+        except OSError: pass
+
+def load_trained(key):
+    bundle = MODEL_REGISTRY.get(key)
+    if bundle is not None: return bundle
+    try:
+        with open(_registry_file(key), 'rb') as f:
+            stored_key, bundle = pickle.load(f)
+        if stored_key != key: return None
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError):
+        return None
+    MODEL_REGISTRY.put(key, bundle)
+    return bundle
+
+def store_trained(key, bundle):
+    MODEL_REGISTRY.put(key, bundle)
+    def write(tmp):
+        with open(tmp, 'wb') as f:
+            pickle.dump((key, bundle), f, protocol=pickle.HIGHEST_PROTOCOL)
+    try: cache.atomic_write(_registry_file(key), write)
+    except OSError: return
+    _prune_registry(key[0])
+
+@instrument.timed()
+def prepare_features(df):
     data = market.add_technical_indicators(df)
-    data['Date_Ord'] = data['Date'].apply(lambda x: x.toordinal())
+    data['Date_Ord'] = market.date_ordinals(data['Date'])
+    return data
+
+@instrument.timed()
+def prepare_features_batch(histories):
+    """
+    prepare_features for {ticker: history} in one pass over the stacked
+    frames; per-ticker results are identical to the single-frame version.
+    """
+    histories = {t: df for t, df in histories.items() if len(df)}
+    if not histories: return {}
+    stacked = pd.concat([df.assign(_ticker=i) for i, df in enumerate(histories.values())], ignore_index=True)
+    data = market.add_technical_indicators(stacked, by='_ticker')
+    data['Date_Ord'] = market.date_ordinals(data['Date'])
+    parts = dict(iter(data.groupby('_ticker', sort=False)))
+    empty = data.iloc[:0].drop(columns='_ticker')
+    return {t: parts[i].drop(columns='_ticker').reset_index(drop=True) if i in parts else empty for i, t in enumerate(histories)}
+
+def _predict_latency(model, row, repeat=5):
+    """
+    Median wall time (ms) of one single-row RecursiveForecaster._predict, the
+    call each forecast step makes (for forests that skips sklearn's joblib
+    dispatch in model.predict).
+    """
+    step = RecursiveForecaster(model)._predict
+    row = np.ascontiguousarray(row, dtype=np.float64)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        step(row)
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times)) * 1000
+
+class _ByteCounter:
+    """File-like sink that only counts what is written to it."""
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(memoryview(data).cast('B'))
+
+def pickled_size(model):
+    """
+    Bytes model pickles to, without holding the pickle in memory. Forests
+    are counted one tree at a time, since the pickler keeps every tree's
+    exported node arrays alive until it finishes (the estimate is within
+    about 1% of the real pickle).
+    """
+    parts = getattr(model, "estimators_", None)
+    if isinstance(parts, list): return sum(pickled_size(tree) for tree in parts)
+    sink = _ByteCounter()
+    pickle.dump(model, sink, protocol=pickle.HIGHEST_PROTOCOL)
+    return sink.size
+
+def _fit_candidate(name, X_train, y_train, X_test, y_test, specs=MODEL_SPECS):
+    """
+    (fitted model, perf row). Fit (s) is the fitting process's CPU time, so
+    it doesn't grow when other joblib workers compete for the cores.
+    """
+    from sklearn.metrics import r2_score, mean_squared_error, mean_absolute_error
+    model = _build(specs, name)
+    t0 = time.process_time()
+    model.fit(X_train.to_numpy(), y_train.to_numpy())
+    fit_s = time.process_time() - t0
+    pred = model.predict(X_test.to_numpy())
+    rmse = np.sqrt(mean_squared_error(y_test, pred))
+    mape = np.mean(np.abs((y_test - pred) / y_test)) * 100
+    mae = mean_absolute_error(y_test, pred)
+    r2 = r2_score(y_test, pred)
+    return model, {"Model": name, "R2 Score": r2, "RMSE": rmse, "MAE": mae, "MAPE (%)": mape, "Fit (s)": fit_s}
+
+def add_costs(perf_df, models, row):
+    """
+    Adds Predict (ms) and Size (MB) for {name: fitted model} to perf_df.
+    Runs serially in the calling process after the fan-out, one model at a
+    time, so latencies aren't inflated by other workers.
+    """
+    row = np.ascontiguousarray(row, dtype=np.float64)
+    perf_df["Predict (ms)"] = [_predict_latency(models[name], row) for name in perf_df.index]
+    perf_df["Size (MB)"] = [pickled_size(models[name]) / 1e6 for name in perf_df.index]
+    return perf_df
+
+def select_model(perf_df, budget=None):
+    """
+    Name of the lowest-RMSE row of perf_df within budget ({cost column: limit},
+    BUDGET by default). Ties keep candidate order; if no row fits, the one
+    with the lowest predict latency is returned.
+    """
+    budget = BUDGET if budget is None else budget
+    ok = pd.Series(True, index=perf_df.index)
+    for col, limit in budget.items():
+        if limit is not None: ok &= perf_df[col] <= limit
+    if not ok.any(): return perf_df["Predict (ms)"].idxmin()
+    return perf_df.loc[ok, "RMSE"].idxmin()
+
+def _fit_final(name, X, y, specs=MODEL_SPECS):
+    model = _build(specs, name)
+    model.fit(X.to_numpy(), y.to_numpy())
+    return model
+
+def _run(tasks, n_jobs, backend):
+    if n_jobs == 1: return [fn(*args) for fn, args in tasks]
+    from joblib import Parallel, delayed
+    return Parallel(n_jobs=n_jobs, backend=backend)(delayed(fn)(*args) for fn, args in tasks)
+
+@instrument.timed()
+def train_ensemble(data, n_jobs=None, backend=None, specs=None):
+    """
+    Model selection, final refit and walk-forward backtest. Everything here
+    is independent of the projection window, so the result can be reused.
+    specs is a model_specs() pair (the untuned defaults when omitted).
     
-    feature_cols = ['Date_Ord', 'MA_5', 'MA_20', 'RSI', 'BB_Upper', 'BB_Lower', 'Lag_1', 'Lag_2', 'Lag_5']
-    X = data[feature_cols]
+    Reality checks come from the walk-forward backtest: exact Ridge fits,
+    but tree models refit only every WALK_FORWARD["refit_every"] origins,
+    so a tree checkpoint is scored by a fit up to refit_every - 1 origins
+    stale.
+
+    The candidate fits and the backtest blocks are fanned out over n_jobs
+    joblib workers; every model has a fixed random_state and backtest blocks
+    do not depend on the worker count, so the result is identical to the
+    serial path (n_jobs=1).
+    """
+    import backtest
+    n_jobs = N_JOBS if n_jobs is None else n_jobs
+    backend = backend or BACKEND
+    model_spec, backtest_spec = specs or (MODEL_SPECS, BACKTEST_SPECS)
+    X = data[FEATURE_COLS]
     y = data['Close']
     
     split = int(len(data) * 0.9)
     X_train, X_test = X.iloc[:split], X.iloc[split:]
     y_train, y_test = y.iloc[:split], y.iloc[split:]
     
-    models = {
-        "Ridge Regression": Ridge(alpha=1.0),
-        "Random Forest": RandomForestRegressor(n_estimators=300, max_depth=15, random_state=42),
-        "Gradient Boosting": GradientBoostingRegressor(n_estimators=300, learning_rate=0.05, max_depth=4, random_state=42)
-    }
-    
-    best_error = float('inf')
-    best_model = None
-    best_name = ""
-    best_metrics = {}
-    perf_data = []
+    # Phase 1: candidate models (selection order follows MODEL_SPECS, as before)
+    fitted = _run([(_fit_candidate, (name, X_train, y_train, X_test, y_test, model_spec)) for name in model_spec], n_jobs, backend)
     
-    for name, model in models.items():
-        model.fit(X_train, y_train)
-        pred = model.predict(X_test)
-        rmse = np.sqrt(mean_squared_error(y_test, pred))
-        mape = np.mean(np.abs((y_test - pred) / y_test)) * 100
-        mae = mean_absolute_error(y_test, pred)
-        r2 = r2_score(y_test, pred)
-        perf_data.append({"Model": name, "R2 Score": r2, "RMSE": rmse, "MAE": mae, "MAPE (%)": mape})
-        
-        if rmse < best_error:
-            best_error = rmse
-            best_model = model
-            best_name = name
-            best_metrics = {"R2": r2, "RMSE": rmse, "MAE": mae, "MAPE": mape}
-
-    perf_df = pd.DataFrame(perf_data).set_index("Model")
-    best_model.fit(X, y)
+    perf_df = pd.DataFrame([row for _, row in fitted]).set_index("Model")
+    add_costs(perf_df, {row["Model"]: model for model, row in fitted}, X_test.to_numpy()[-1:])
+    best_name = select_model(perf_df)
+    best = perf_df.loc[best_name]
+    best_metrics = {"R2": best["R2 Score"], "RMSE": best["RMSE"], "MAE": best["MAE"], "MAPE": best["MAPE (%)"]}
     
-    future_prices = []
-    future_dates = []
-    last_row = data.iloc[-1]
-    curr_state = {
-        'Date': last_row['Date'], 'Close': last_row['Close'],
-        'Lag_1': last_row['Close'], 'Lag_2': last_row['Lag_1'], 'Lag_5': last_row['Lag_5'],
-        'MA_5': last_row['MA_5'], 'MA_20': last_row['MA_20'],
-        'BB_Upper': last_row['BB_Upper'], 'BB_Lower': last_row['BB_Lower'], 'RSI': last_row['RSI']
-    }
+    # Phase 2: final refit on all data, then the walk-forward backtest whose
+    # most recent origins double as the reality-check points. Ridge is exact
+    # at every origin; tree models predict from a fit up to refit_every - 1
+    # origins stale, so their reality checks can lag the data by that much.
+    best_model = _fit_final(best_name, X, y, model_spec)
+    bt_cls, bt_params = backtest_spec[best_name]
+    wf = backtest.walk_forward(bt_cls(**bt_params), X.to_numpy(dtype=np.float64), y.to_numpy(), data['Date'].to_numpy(),
+                               n_jobs=n_jobs, backend=backend, **WALK_FORWARD)
+    best_metrics.update({"WF RMSE": wf["RMSE"], "WF MAE": wf["MAE"], "WF MAPE": wf["MAPE"], "WF Origins": wf["Origins"]})
     
-    for i in range(days):
-        curr_state['Date'] += timedelta(days=1)
-        future_dates.append(curr_state['Date'])
-        feat = pd.DataFrame([{
-            'Date_Ord': curr_state['Date'].toordinal(),
-            'MA_5': curr_state['MA_5'], 'MA_20': curr_state['MA_20'],
-            'RSI': curr_state['RSI'], 'BB_Upper': curr_state['BB_Upper'], 'BB_Lower': curr_state['BB_Lower'],
-            'Lag_1': curr_state['Lag_1'], 'Lag_2': curr_state['Lag_2'], 'Lag_5': curr_state['Lag_5']
-        }])
-        pred = best_model.predict(feat)[0]
-        future_prices.append(pred)
-        curr_state['Lag_5'] = curr_state['Lag_2']
-        curr_state['Lag_2'] = curr_state['Lag_1']
-        curr_state['Lag_1'] = pred
-        curr_state['MA_5'] = (curr_state['MA_5'] * 4 + pred) / 5
-        
     checkpoints = {"Today": 0, "Yesterday": 1, "Last Week": 7, "Last Month": 30}
     reality_check = {}
+    preds = wf["predictions"]
     for label, gap in checkpoints.items():
-        target_idx = -1 - gap
-        if len(data) > abs(target_idx) + 50:
-            if gap == 0: train_sub, target_row = data.iloc[:-1], data.iloc[-1]
-            else: train_sub, target_row = data.iloc[:target_idx], data.iloc[target_idx]
-            
-            if "Ridge" in best_name: model_bt = Ridge(alpha=1.0)
-            elif "Forest" in best_name: model_bt = RandomForestRegressor(n_estimators=150, max_depth=10, random_state=42)
-            else: model_bt = GradientBoostingRegressor(n_estimators=150, max_depth=3, learning_rate=0.05, random_state=42)
-                
-            model_bt.fit(train_sub[feature_cols], train_sub['Close'])
-            feat_bt = pd.DataFrame([target_row[feature_cols]])
-            pred_val = model_bt.predict(feat_bt)[0]
+        pos = len(data) - 1 - gap
+        if pos in preds.index:
+            target_row = data.iloc[pos]
             reality_check[label] = {
-                "Date": target_row['Date'], "Actual": target_row['Close'], "Predicted": pred_val
+                "Date": target_row['Date'], "Actual": target_row['Close'], "Predicted": preds.at[pos, "Predicted"]
             }
-            
-    return future_prices[-1], future_prices, future_dates, best_metrics, reality_check, perf_df, best_name
\ No newline at end of file
+
+    last_row = data.iloc[-1]
+    return {
+        "model": best_model, "name": best_name, "metrics": best_metrics,
+        "perf_df": perf_df, "reality_check": reality_check,
+        "last_row": last_row[['Date', 'Close'] + FEATURE_COLS].to_dict()
+    }
+
+STATE_COLS = ['Date_Ord', 'Close', 'Lag_1', 'Lag_5', 'MA_5', 'MA_20', 'RSI', 'BB_Upper', 'BB_Lower']
+
+def state_vector(last_row):
+    """Packs the last feature row into the float vector RecursiveForecaster starts from."""
+    row = dict(last_row)
+    if 'Date_Ord' not in row: row['Date_Ord'] = pd.Timestamp(row['Date']).toordinal()
+    return np.array([row[c] for c in STATE_COLS], dtype=np.float64)
+
+class RecursiveForecaster:
+    """
+    Recursive multi-step forecaster over preallocated NumPy buffers.
+
+    Each scenario owns one row of a path buffer laid out as
+    [Lag_5, Lag_1, Close, pred_0, pred_1, ...], so at step i the lag features
+    are just columns i+2, i+1 and i of that buffer (Lag_1, Lag_2, Lag_5) and
+    nothing is shifted or copied. MA_5 is advanced in place, the other
+    indicators are held at their last observed value, and every step makes a
+    single predict call on a raw (scenarios x features) array. Linear models
+    (Ridge, or anything flagged is_linear with coef_/intercept_, such as
+    online.OnlineForecaster) skip sklearn entirely; forests sum their
+    trees in estimator order (as RandomForestRegressor.predict does) without
+    the per-call thread-pool dispatch.
+    """
+    def __init__(self, model):
+        self.model = model
+        self._linear = getattr(model, "is_linear", False) or isinstance(model, Ridge.resolve())
+        self._forest = not self._linear and isinstance(model, RandomForestRegressor.resolve())
+        if self._linear:
+            self._coef = np.ascontiguousarray(model.coef_, dtype=np.float64)
+            self._intercept = float(model.intercept_)
+
+    def _predict(self, X):
+        if self._linear: return X @ self._coef + self._intercept
+        if self._forest:
+            X32 = X.astype(np.float32)
+            out = np.zeros(X.shape[0])
+            for tree in self.model.estimators_: out += tree.predict(X32, check_input=False)
+            return out / len(self.model.estimators_)
+        return self.model.predict(X)
+
+    def forecast(self, states, days):
+        """
+        states: (n_scenarios, len(STATE_COLS)) or a single state vector.
+        Returns a (n_scenarios, days) array of predicted closes.
+        """
+        states = np.atleast_2d(np.asarray(states, dtype=np.float64))
+        n = states.shape[0]
+        col = {c: i for i, c in enumerate(STATE_COLS)}
+        
+        path = np.empty((n, days + 3))
+        path[:, 0] = states[:, col['Lag_5']]
+        path[:, 1] = states[:, col['Lag_1']]
+        path[:, 2] = states[:, col['Close']]
+        
+        X = np.empty((n, len(FEATURE_COLS)))
+        for name in ('MA_20', 'RSI', 'BB_Upper', 'BB_Lower'):
+            X[:, FEATURE_COLS.index(name)] = states[:, col[name]]
+        i_ord, i_ma5 = FEATURE_COLS.index('Date_Ord'), FEATURE_COLS.index('MA_5')
+        i_l1, i_l2, i_l5 = FEATURE_COLS.index('Lag_1'), FEATURE_COLS.index('Lag_2'), FEATURE_COLS.index('Lag_5')
+        X[:, i_ord] = states[:, col['Date_Ord']]
+        X[:, i_ma5] = states[:, col['MA_5']]
+        
+        if self._linear: ctx = contextlib.nullcontext()
+        else:
+            from sklearn import config_context
+            ctx = config_context(assume_finite=True)
+        with ctx:
+            for i in range(days):
+                X[:, i_ord] += 1
+                X[:, i_l1] = path[:, i + 2]
+                X[:, i_l2] = path[:, i + 1]
+                X[:, i_l5] = path[:, i]
+                pred = self._predict(X)
+                path[:, i + 3] = pred
+                X[:, i_ma5] = (X[:, i_ma5] * 4 + pred) / 5
+        return path[:, 3:]
+
+    def forecast_horizons(self, states, horizons):
+        """Prediction at each horizon (in days) from one pass up to max(horizons)."""
+        paths = self.forecast(states, max(horizons))
+        return {h: paths[:, h - 1] for h in horizons}
+
+@instrument.timed(rows=lambda r: len(r[0]))
+def recursive_forecast(best_model, last_row, days):
+    path = RecursiveForecaster(best_model).forecast(state_vector(last_row), days)[0]
+    future_dates = list(pd.date_range(pd.Timestamp(last_row['Date']) + pd.Timedelta(days=1), periods=days, freq='D'))
+    return path.tolist(), future_dates
+
+class ForecastResult:
+    """Per-ticker outcome of forecast_batch. timings holds seconds per stage plus where the models came from."""
+    def __init__(self, ticker, prices=(), dates=(), metrics=None, reality_check=None, perf=None, model_name="Insufficient Data", timings=None):
+        self.ticker = ticker
+        self.prices = list(prices)
+        self.dates = list(dates)
+        self.metrics = metrics or {}
+        self.reality_check = reality_check or {}
+        self.perf = pd.DataFrame() if perf is None else perf
+        self.model_name = model_name
+        self.timings = timings or {}
+
+    @property
+    def target(self):
+        return self.prices[-1] if self.prices else 0.0
+
+    @property
+    def ok(self):
+        return bool(self.prices)
+
+    def as_tuple(self):
+        """The legacy run_ensemble_forecast 7-tuple."""
+        return self.target, self.prices, self.dates, self.metrics, self.reality_check, self.perf, self.model_name
+
+    def __repr__(self):
+        return f"ForecastResult({self.ticker!r}, {self.model_name!r}, target={self.target:.2f}, days={len(self.prices)})"
+
+def _train_timed(data, n_jobs, backend, specs=None):
+    t0 = time.perf_counter()
+    bundle = train_ensemble(data, n_jobs, backend, specs)
+    return bundle, time.perf_counter() - t0
+
+@instrument.timed(rows=len)
+def forecast_batch(histories, days=30, n_jobs=None, backend=None, use_registry=True):
+    """
+    Forecasts {ticker: history} -> {ticker: ForecastResult}.
+
+    Registry hits are served directly. Features for the misses are built in
+    one stacked pass and their ensembles are trained in parallel, one ticker
+    per joblib worker (a single miss parallelizes over its candidate models
+    instead). Histories under 100 bars get an empty "Insufficient Data"
+    result. A None ticker (or use_registry=False) always trains.
+    """
+    n_jobs = N_JOBS if n_jobs is None else n_jobs
+    backend = backend or BACKEND
+    results, bundles, keys, specs, timings = {}, {}, {}, {}, {}
+    for ticker, df in histories.items():
+        if len(df) < 100:
+            results[ticker] = ForecastResult(ticker)
+            continue
+        timings[ticker] = {"features": 0.0, "train": 0.0, "source": "trained"}
+        specs[ticker] = model_specs(ticker)
+        if use_registry and ticker is not None:
+            keys[ticker] = registry_key(ticker, df, specs[ticker])
+            in_memory = keys[ticker] in MODEL_REGISTRY
+            bundle = load_trained(keys[ticker])
+            if bundle is not None:
+                bundles[ticker] = bundle
+                timings[ticker]["source"] = "memory" if in_memory else "disk"
+
+    missing = [t for t in timings if t not in bundles]
+    if missing:
+        t0 = time.perf_counter()
+        features = prepare_features_batch({t: histories[t] for t in missing})
+        share = (time.perf_counter() - t0) / len(missing)
+        inner = n_jobs if len(missing) == 1 else 1
+        trained = _run([(_train_timed, (features[t], inner, backend, specs[t])) for t in missing], 1 if len(missing) == 1 else n_jobs, backend)
+        for t, (bundle, seconds) in zip(missing, trained):
+            bundles[t] = bundle
+            timings[t].update(features=share, train=seconds)
+            if t in keys: store_trained(keys[t], bundle)
+
+    for ticker in timings:
+        bundle = bundles[ticker]
+        t0 = time.perf_counter()
+        prices, dates = recursive_forecast(bundle["model"], bundle["last_row"], days)
+        timings[ticker]["forecast"] = time.perf_counter() - t0
+        results[ticker] = ForecastResult(ticker, prices, dates, bundle["metrics"], bundle["reality_check"], bundle["perf_df"], bundle["name"], timings[ticker])
+    return {t: results[t] for t in histories}
+
+@instrument.timed(rows=lambda r: len(r[1]))
+def run_ensemble_forecast(df, days=30, ticker=None, n_jobs=None):
+    return forecast_batch({ticker: df}, days, n_jobs)[ticker].as_tuple()
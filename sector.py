@@ -0,0 +1,152 @@
+"""
+Cross-sectional sector engine.
+
+Loads every company's statements once into a (company x metric x year)
+float64 cube and computes growth, ratios and verdict scores for the whole
+universe with array operations, so companies can be ranked and screened
+against each other without re-running the single-company page.
+"""
+
+import numpy as np
+import pandas as pd
+
+import companies
+import financials
+import verdict
+
+TREND_METRICS = ['Revenue', 'Net Income', 'Total Assets', 'Total Equity', 'Total Liabilities']
+RATIO_METRICS = ['Inventory Turnover', 'Current Ratio', 'Quick Ratio', 'AP Turnover']
+METRICS = TREND_METRICS + RATIO_METRICS
+
+fiscal_year = financials.fiscal_year
+
+def _first_last(values):
+    """
+    First and last finite non-zero entry along the year axis.
+    Returns (first_idx, last_idx, count); indices are -1 where a row has none.
+    """
+    mask = np.isfinite(values) & (values != 0)
+    count = mask.sum(axis=-1)
+    first = np.where(count > 0, mask.argmax(axis=-1), -1)
+    last = np.where(count > 0, values.shape[-1] - 1 - mask[..., ::-1].argmax(axis=-1), -1)
+    return first, last, count
+
+def _take(values, idx):
+    out = np.take_along_axis(values, np.maximum(idx, 0)[..., None], axis=-1)[..., 0]
+    return np.where(idx >= 0, out, np.nan)
+
+class SectorCube:
+    def __init__(self, labels, segments, tickers, years, values):
+        self.labels = list(labels)
+        self.segments = np.asarray(segments)
+        self.tickers = list(tickers)
+        self.years = np.asarray(years)
+        self.metrics = list(METRICS)
+        self.values = values
+
+    @classmethod
+    def load(cls, universe=None):
+        """One pass over every company's statements (through the statement cache)."""
+        universe = universe or companies.all_companies()
+        frames = {}
+        for label, entry in universe.items():
+            datasets = financials.load_local_data(entry["file"])
+            trend = pd.concat([financials.get_trend_data_local(datasets), financials.get_balance_sheet_trend(datasets)], axis=1)
+            ratios = datasets.get("Ratios", pd.DataFrame())
+            for key, keywords in financials.RATIO_TARGETS.items():
+                row = financials.find_row(ratios, keywords)
+                if row is not None: trend[key] = row
+            trend.index = [fiscal_year(i) for i in trend.index]
+            frames[label] = trend
+
+        years = sorted({y for f in frames.values() for y in f.index if y is not None})
+        values = np.full((len(frames), len(METRICS), len(years)), np.nan)
+        year_pos = {y: i for i, y in enumerate(years)}
+        for c, frame in enumerate(frames.values()):
+            cols = [year_pos[y] for y in frame.index if y is not None]
+            rows = frame.loc[[y is not None for y in frame.index]]
+            for m, metric in enumerate(METRICS):
+                if metric in rows.columns:
+                    values[c, m, cols] = pd.to_numeric(rows[metric], errors='coerce').to_numpy(dtype=np.float64)
+
+        return cls(universe.keys(), [e["segment"] for e in universe.values()], [e["ticker"] for e in universe.values()], years, values)
+
+    def series(self, metric):
+        """(company x year) view of one metric."""
+        return self.values[:, self.metrics.index(metric), :]
+
+    def latest(self, metric):
+        """Latest non-zero value per company, as financials.get_latest_value (NaN instead of 0.0 when absent)."""
+        values = self.series(metric)
+        _, last, _ = _first_last(values)
+        return _take(values, last)
+
+    def growth(self, metric):
+        """
+        First-to-last growth per company on the non-zero years, matching
+        financials.calculate_growth_metrics: start, end, pct, plus CAGR (%).
+        """
+        values = self.series(metric)
+        first, last, count = _first_last(values)
+        start, end = _take(values, first), _take(values, last)
+        valid = count >= 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(valid, (end - start) / np.abs(start) * 100, np.nan)
+            span = np.where(valid, self.years[np.maximum(last, 0)] - self.years[np.maximum(first, 0)], 0)
+            ok = valid & (start > 0) & (end > 0) & (span > 0)
+            cagr = np.where(ok, (np.abs(end / start) ** (1 / np.where(span > 0, span, 1)) - 1) * 100, np.nan)
+        return {"start": start, "end": end, "pct": pct, "cagr": cagr, "years": count}
+
+    def summary(self, price_above_ma50=None, pe=None):
+        """
+        One row per company with growth, profitability, balance-sheet and
+        efficiency measures plus the verdict score. price_above_ma50 and pe
+        are optional per-company arrays (market data is not in the cube);
+        missing market inputs simply score zero for that signal.
+        """
+        rev, profit, assets = self.growth('Revenue'), self.growth('Net Income'), self.growth('Total Assets')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            margin = self.series('Net Income') / self.series('Revenue') * 100
+            roe = self.latest('Net Income') / self.latest('Total Equity') * 100
+            leverage = self.latest('Total Liabilities') / self.latest('Total Equity')
+        n = len(self.labels)
+        above = np.zeros(n, dtype=bool) if price_above_ma50 is None else np.asarray(price_above_ma50, dtype=bool)
+        pe = np.full(n, np.nan) if pe is None else np.asarray(pe, dtype=np.float64)
+        score = verdict.score_signals(above, np.nan_to_num(rev["pct"]), pe)
+
+        df = pd.DataFrame({
+            "Segment": self.segments,
+            "Ticker": self.tickers,
+            "Revenue Growth (%)": rev["pct"],
+            "Revenue CAGR (%)": rev["cagr"],
+            "Net Profit Growth (%)": profit["pct"],
+            "Net Profit CAGR (%)": profit["cagr"],
+            "Assets Growth (%)": assets["pct"],
+            "Net Margin (%)": _take(margin, _first_last(margin)[1]),
+            "ROE (%)": roe,
+            "Liabilities / Equity": leverage,
+            **{m: self.latest(m) for m in RATIO_METRICS},
+            "Verdict Score": score,
+            "Rating": verdict.rating_for_score(score),
+        }, index=pd.Index(self.labels, name="Company"))
+        return df
+
+    def rank(self, measure, segment=None, top=None, ascending=False, **market):
+        """Companies ordered by one summary measure, e.g. rank("Revenue CAGR (%)", segment="Mid Cap", top=1)."""
+        df = self.screen(segment=segment, **market)
+        df = df.sort_values(measure, ascending=ascending, na_position='last')
+        return df if top is None else df.head(top)
+
+    def screen(self, segment=None, where=None, **market):
+        """
+        Filters the summary. where maps measure -> (low, high), either bound
+        may be None: screen(where={"Net Margin (%)": (5, None)}).
+        """
+        df = self.summary(**market)
+        keep = np.ones(len(df), dtype=bool)
+        if segment is not None: keep &= (df["Segment"] == segment).to_numpy()
+        for measure, (lo, hi) in (where or {}).items():
+            col = df[measure].to_numpy(dtype=np.float64)
+            if lo is not None: keep &= col >= lo
+            if hi is not None: keep &= col <= hi
+        return df[keep]
@@ -0,0 +1,150 @@
+"""
+Precomputed dashboard snapshot.
+
+    python snapshot.py            # nightly job: rebuild for every company
+    python snapshot.py Titan      # only some labels (others are carried over)
+
+Everything main.py shows for a company (price tail, statements analytics,
+model selection, reality checks, verdict and a 30-day forecast path) is
+computed once and written to a single zip with one pickled entry per
+company, so the app can open just the selected company. Forecasts for every
+slider value are prefixes of the 30-day path: the recursive forecaster's
+day d only depends on days before it.
+"""
+import os
+import pickle
+import sys
+import threading
+import time
+import zipfile
+
+import cache
+import companies
+import financials
+import market
+import prediction
+import verdict
+
+SNAPSHOT_FILE = os.environ.get("RSA_SNAPSHOT", os.path.join(cache.CACHE_DIR, "snapshot.zip"))
+MAX_DAYS = 30
+CHART_BARS = 180
+MAX_AGE = 12 * 3600
+# minimum seconds between background rebuild attempts, successful or not
+MIN_REFRESH = float(os.environ.get("RSA_SNAPSHOT_RETRY", 600))
+
+_ENTRIES = cache.LRUCache(maxsize=16)
+_REFRESH_LOCK = threading.Lock()
+_refreshing = None
+_last_attempt = None
+# label -> "Type: message" for companies whose last rebuild failed
+ERRORS = {}
+
+def build_entry(label, entry):
+    """Runs the live page pipeline for one company."""
+    df, info, news = market.fetch_page(entry["ticker"])
+    local = financials.load_local_data(entry["file"])
+    growth = financials.calculate_growth_metrics(local)
+    ratios = financials.get_ratios_latest(local)
+    cf_trend = financials.get_cash_flow_trend(local)
+    curr_ratio = info.get('currentRatio', 0)
+    if curr_ratio is None or curr_ratio == 0: curr_ratio = financials.get_current_ratio_fallback(local)
+    out = {
+        "label": label, "ticker": entry["ticker"], "built_at": time.time(),
+        "info": info, "news": news,
+        "prices": df.tail(CHART_BARS).reset_index(drop=True), "listing_price": market.get_listing_price(df),
+        "trend": financials.get_trend_data_local(local), "bs_trend": financials.get_balance_sheet_trend(local),
+        "ratios": ratios, "growth": growth, "cf_trend": cf_trend, "cf_metrics": financials.get_cash_flow_metrics(cf_trend),
+        "current_ratio": curr_ratio, "forecast": None
+    }
+    if df.empty: return out
+    last_date = str(df['Date'].iloc[-1].date())
+    target, path, dates, metrics, reality, perf, name = prediction.run_ensemble_forecast(df, MAX_DAYS, ticker=entry["ticker"])
+    # too short a history to forecast: leave forecast None so main.py runs the live path
+    if not path: return out
+    out.update({
+        "last_date": last_date, "verdict": verdict.generate_verdict(info, df, growth, ratios),
+        "forecast": {"path": path, "dates": dates, "metrics": metrics, "reality": reality, "perf": perf, "model": name}
+    })
+    return out
+
+def build(labels=None, path=None):
+    """
+    Rebuilds the snapshot. With labels only those companies are recomputed;
+    the rest are copied over from the existing artifact, as is the old entry
+    of any company whose rebuild fails (see ERRORS). Returns the labels that
+    were written.
+    """
+    path = path or SNAPSHOT_FILE
+    universe = companies.all_companies()
+    labels = list(universe) if labels is None else labels
+    blobs = {}
+    for label in labels:
+        try:
+            blobs[label] = pickle.dumps(build_entry(label, universe[label]), protocol=pickle.HIGHEST_PROTOCOL)
+            ERRORS.pop(label, None)
+        except Exception as e: ERRORS[label] = f"{type(e).__name__}: {e}"
+    try:
+        with zipfile.ZipFile(path) as old:
+            for name in old.namelist():
+                label = name[:-len(".pkl")]
+                if label in universe and label not in blobs: blobs[label] = old.read(name)
+    except (OSError, zipfile.BadZipFile): pass
+
+    def write(tmp):
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+            for label, blob in blobs.items(): zf.writestr(f"{label}.pkl", blob)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    cache.atomic_write(path, write)
+    return list(blobs)
+
+def load(label, path=None):
+    """The snapshot entry for one company, or None. Only that entry is read and unpickled."""
+    path = path or SNAPSHOT_FILE
+    try: key = (cache.file_key(path), label)
+    except OSError: return None
+    entry = _ENTRIES.get(key)
+    if entry is not None: return entry
+    try:
+        with zipfile.ZipFile(path) as zf: entry = pickle.loads(zf.read(f"{label}.pkl"))
+    except (OSError, KeyError, zipfile.BadZipFile, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    _ENTRIES.put(key, entry)
+    return entry
+
+def forecast(entry, days):
+    """(target, prices, dates) for a projection window of `days` (1..MAX_DAYS) from the stored path."""
+    fc = entry["forecast"]
+    if not fc or not fc["path"]: raise ValueError(f"no stored forecast for {entry['label']}")
+    days = max(1, min(days, len(fc["path"])))
+    return fc["path"][days - 1], fc["path"][:days], fc["dates"][:days]
+
+def is_stale(entry, max_age=MAX_AGE):
+    return entry is None or time.time() - entry["built_at"] > max_age
+
+def refresh_async(labels=None, path=None, min_interval=None):
+    """
+    Rebuilds in a daemon thread. A call while a rebuild is running, or within
+    min_interval (MIN_REFRESH) seconds of the last attempt, is ignored, so a
+    company that keeps failing doesn't trigger a rebuild on every rerun.
+    Returns the thread or None.
+    """
+    global _refreshing, _last_attempt
+    min_interval = MIN_REFRESH if min_interval is None else min_interval
+    with _REFRESH_LOCK:
+        if _refreshing is not None and _refreshing.is_alive(): return None
+        now = time.monotonic()
+        if _last_attempt is not None and now - _last_attempt < min_interval: return None
+        _last_attempt = now
+        def run():
+            try: build(labels, path)
+            except Exception: pass
+        _refreshing = threading.Thread(target=run, name="snapshot-refresh", daemon=True)
+        _refreshing.start()
+        return _refreshing
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    written = build(sys.argv[1:] or None)
+    print(f"snapshot {SNAPSHOT_FILE}: {len(written)} companies in {time.perf_counter() - t0:.1f}s")
+    for label, error in ERRORS.items(): print(f"  {label} failed: {error}")
+    sys.exit(1 if ERRORS else 0)
@@ -0,0 +1,189 @@
+"""
+Local OHLCV store.
+
+One memory-mappable .npy per ticker holding a float64 (bars x 6) matrix:
+[date (days since 1970-01-01), Open, High, Low, Close, Volume], sorted by
+date. A small <ticker>.meta.json next to it records the last sync attempt
+and the cached stock.info. Writes go through cache.atomic_write, so a
+reader never sees a partial file.
+"""
+import glob
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import cache
+
+STORE_DIR = os.environ.get("RSA_STORE_DIR", os.path.join(cache.CACHE_DIR, "ohlcv"))
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+SYNC_EVERY = 3600
+INFO_TTL = 24 * 3600
+# date.toordinal() of the store's day zero (1970-01-01)
+EPOCH_ORDINAL = 719163
+_META_LOCK = threading.Lock()
+
+def _path(ticker, suffix):
+    os.makedirs(STORE_DIR, exist_ok=True)
+    return os.path.join(STORE_DIR, f"{ticker}{suffix}")
+
+def csv_dumps(folder="."):
+    """Maps <SYMBOL>_stock_10yrs.csv dumps (Data_Import.py output) to NSE tickers."""
+    return {f"{os.path.basename(p).split('_stock_')[0]}.NS": p for p in glob.glob(os.path.join(folder, "*_stock_10yrs.csv"))}
+
+def read_price_csv(path):
+    """
+    Reads a yf.download dump (Price/Ticker/Date multi-header, e.g.
+    DMART_stock_10yrs.csv) into the same layout as fetch_history_data.
+    """
+    df = pd.read_csv(path, skiprows=[1, 2]).rename(columns={"Price": "Date"})
+    df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+def to_matrix(df):
+    """History frame (Date + OHLCV) -> sorted, de-duplicated float64 store matrix."""
+    days = pd.to_datetime(df['Date']).to_numpy().astype('datetime64[D]').astype(np.int64)
+    arr = np.column_stack([days.astype(np.float64)] + [pd.to_numeric(df[c], errors='coerce').to_numpy(dtype=np.float64) for c in COLUMNS])
+    arr = arr[~np.isnan(arr[:, 4])]
+    _, last = np.unique(arr[::-1, 0], return_index=True)
+    return arr[len(arr) - 1 - last]
+
+def read(ticker):
+    """Memory-mapped store matrix for ticker, or None if nothing is stored yet."""
+    try: return np.load(_path(ticker, ".npy"), mmap_mode='r')
+    except (OSError, ValueError): return None
+
+def write(ticker, arr):
+    def save(tmp):
+        with open(tmp, 'wb') as f: np.save(f, np.ascontiguousarray(arr, dtype=np.float64))
+    cache.atomic_write(_path(ticker, ".npy"), save)
+
+def merge(ticker, df):
+    """Adds bars from df; on overlapping dates the new bars win. Returns the number of new dates."""
+    new = to_matrix(df)
+    old = read(ticker)
+    if old is None or len(old) == 0:
+        write(ticker, new)
+        return len(new)
+    combined = np.concatenate([np.asarray(old), new])
+    _, last = np.unique(combined[::-1, 0], return_index=True)
+    merged = combined[len(combined) - 1 - last]
+    write(ticker, merged)
+    return len(merged) - len(old)
+
+def last_date(ticker):
+    arr = read(ticker)
+    if arr is None or len(arr) == 0: return None
+    return pd.Timestamp(np.datetime64(int(arr[-1, 0]), 'D'))
+
+def window(ticker, start=None, end=None):
+    """Zero-copy view of the stored rows with start <= date <= end."""
+    arr = read(ticker)
+    if arr is None: return None
+    lo = 0 if start is None else np.searchsorted(arr[:, 0], pd.Timestamp(start).to_datetime64().astype('datetime64[D]').astype(np.int64), 'left')
+    hi = len(arr) if end is None else np.searchsorted(arr[:, 0], pd.Timestamp(end).to_datetime64().astype('datetime64[D]').astype(np.int64), 'right')
+    return arr[lo:hi]
+
+def to_frame(arr):
+    """Store rows -> the fetch_history_data layout (Date, Open, High, Low, Close, Volume)."""
+    df = pd.DataFrame(arr[:, 1:], columns=COLUMNS, copy=False)
+    df.insert(0, 'Date', pd.to_datetime(arr[:, 0].astype(np.int64).astype('datetime64[D]')).astype('datetime64[ns]'))
+    return df
+
+def read_meta(ticker):
+    try:
+        with open(_path(ticker, ".meta.json")) as f: return json.load(f)
+    except (OSError, ValueError): return {}
+
+def write_meta(ticker, meta):
+    def save(tmp):
+        with open(tmp, 'w') as f: json.dump(meta, f, default=str)
+    cache.atomic_write(_path(ticker, ".meta.json"), save)
+
+def update_meta(ticker, **fields):
+    """
+    Sets fields in the meta file, re-reading it under a lock so concurrent
+    history and info fetches for one ticker don't overwrite each other.
+    """
+    with _META_LOCK:
+        meta = read_meta(ticker)
+        meta.update(fields)
+        write_meta(ticker, meta)
+    return meta
+
+def update_manifest(entries):
+    """Records the latest ingestion result per ticker in <STORE_DIR>/manifest.json."""
+    path = os.path.join(STORE_DIR, "manifest.json")
+    try:
+        with open(path) as f: manifest = json.load(f)
+    except (OSError, ValueError): manifest = {}
+    now = time.time()
+    for ticker, entry in entries.items(): manifest[ticker] = dict(manifest.get(ticker, {}), **entry, at=now)
+    def save(tmp):
+        with open(tmp, 'w') as f: json.dump(manifest, f, indent=1, default=str)
+    os.makedirs(STORE_DIR, exist_ok=True)
+    cache.atomic_write(path, save)
+
+def seed(ticker):
+    """Fills an empty store entry from a bundled CSV dump, if one exists."""
+    if read(ticker) is not None: return False
+    path = csv_dumps().get(ticker)
+    if path is None: return False
+    merge(ticker, read_price_csv(path))
+    return True
+
+def _download(ticker, start):
+    import yfinance as yf
+    stock = yf.Ticker(ticker)
+    hist = stock.history(start=start, interval="1d") if start else stock.history(period="max", interval="1d")
+    if hist.empty: return hist
+    hist.index = hist.index.tz_localize(None)
+    return hist.reset_index()
+
+def sync(ticker, force=False, download=_download):
+    """
+    Fetches only the bars after the last stored date. Attempts are throttled to
+    one per SYNC_EVERY seconds and network errors leave the store untouched.
+    """
+    if not force and time.time() - read_meta(ticker).get("synced_at", 0) < SYNC_EVERY: return 0
+    synced_at = time.time()
+    added = 0
+    try:
+        last = last_date(ticker)
+        start = None if last is None else (last + pd.Timedelta(days=1)).strftime('%Y-%m-%d')
+        if last is None or last.normalize() < pd.Timestamp.today().normalize():
+            hist = download(ticker, start)
+            if hist is not None and not hist.empty: added = merge(ticker, hist)
+    except Exception: pass
+    update_meta(ticker, synced_at=synced_at)
+    return added
+
+def history(ticker, start=None, end=None, sync_now=True):
+    seed(ticker)
+    if sync_now: sync(ticker)
+    arr = window(ticker, start, end)
+    if arr is None: return pd.DataFrame()
+    return to_frame(arr)
+
+def _fetch_info(ticker):
+    import yfinance as yf
+    return yf.Ticker(ticker).info
+
+def info(ticker, fetch=_fetch_info):
+    """
+    stock.info cached in the meta file for INFO_TTL. When offline the last
+    stored copy (or {}) is returned and the next attempt waits SYNC_EVERY.
+    """
+    meta = read_meta(ticker)
+    now = time.time()
+    if now - meta.get("info_at", 0) < INFO_TTL and "info" in meta: return meta["info"]
+    if now - meta.get("info_tried_at", 0) < SYNC_EVERY: return meta.get("info", {})
+    fields = {"info_tried_at": now}
+    try:
+        fresh = fetch(ticker)
+        if fresh: fields.update(info=fresh, info_at=now)
+    except Exception: pass
+    return update_meta(ticker, **fields).get("info", {})
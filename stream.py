@@ -0,0 +1,111 @@
+"""
+Chunked price pipeline.
+
+Reads a ticker's bars from the memory-mapped store in fixed-size blocks and
+turns each block into the prediction.prepare_features layout (indicators,
+lags, Date_Ord), carrying the last HALO closes across block boundaries so
+every rolling window sees the same bars it would in one pass. Blocks can be
+scored as they are produced, so peak memory depends on block_size rather
+than on the length of the history or the number of tickers.
+
+    for block in stream.feature_blocks("DMART.NS"): ...
+    preds = stream.predict(model, "DMART.NS")
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import prediction
+import store
+from indicators import INDICATOR_COLS
+
+BLOCK_SIZE = 4096
+# Closes carried into the next block: 19 for the 20-bar windows, plus one so
+# the first RSI delta of the block has its predecessor
+HALO = 20
+
+def _rolling(x, window, fn):
+    out = np.full(len(x), np.nan)
+    if len(x) >= window: out[window - 1:] = fn(sliding_window_view(x, window))
+    return out
+
+def _lag(x, k):
+    out = np.full(len(x), np.nan)
+    out[k:] = x[:-k]
+    return out
+
+def indicator_arrays(closes):
+    """
+    market.add_technical_indicators on a bare close array (before dropna).
+    Each window is summed directly instead of with pandas' running sums, so
+    values agree with the batch version to floating-point rounding.
+    """
+    delta = np.diff(closes, prepend=closes[:1])
+    ma5 = _rolling(closes, 5, lambda w: w.mean(axis=1))
+    ma20 = _rolling(closes, 20, lambda w: w.mean(axis=1))
+    std20 = _rolling(closes, 20, lambda w: w.std(axis=1, ddof=1))
+    gain = _rolling(np.where(delta > 0, delta, 0.0), 14, lambda w: w.mean(axis=1))
+    loss = _rolling(np.where(delta < 0, -delta, 0.0), 14, lambda w: w.mean(axis=1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + gain / loss))
+    return {
+        'MA_5': ma5, 'MA_20': ma20, 'RSI': rsi,
+        'BB_Upper': ma20 + std20 * 2, 'BB_Lower': ma20 - std20 * 2,
+        'Lag_1': _lag(closes, 1), 'Lag_2': _lag(closes, 2), 'Lag_5': _lag(closes, 5)
+    }
+
+def blocks(source, block_size=BLOCK_SIZE, start=None, end=None):
+    """Store rows of a ticker (or an already-open store matrix) as zero-copy blocks."""
+    arr = store.window(source, start, end) if isinstance(source, str) else source
+    if arr is None: return
+    for i in range(0, len(arr), block_size):
+        yield arr[i:i + block_size]
+
+def feature_arrays(source, block_size=BLOCK_SIZE, start=None, end=None):
+    """
+    Yields (store rows, {feature: array}) per block with the warm-up rows
+    dropped; the features are INDICATOR_COLS plus Date_Ord.
+    """
+    carry = np.empty(0)
+    for block in blocks(source, block_size, start, end):
+        closes = np.concatenate([carry, block[:, 4]])
+        ind = indicator_arrays(closes)
+        skip = len(carry)
+        carry = closes[-HALO:]
+
+        keep = ~np.isnan(block[:, 1:]).any(axis=1)
+        for c in INDICATOR_COLS: keep &= ~np.isnan(ind[c][skip:])
+        if not keep.any(): continue
+        feats = {c: ind[c][skip:][keep] for c in INDICATOR_COLS}
+        feats['Date_Ord'] = block[keep, 0].astype(np.int64) + store.EPOCH_ORDINAL
+        yield block[keep], feats
+
+def feature_blocks(source, block_size=BLOCK_SIZE, start=None, end=None):
+    """
+    prepare_features() one block at a time: yields DataFrames with the same
+    columns and rows as the single-pass version.
+    """
+    for rows, feats in feature_arrays(source, block_size, start, end):
+        yield pd.concat([store.to_frame(rows), pd.DataFrame(feats)], axis=1)
+
+def predict_blocks(model, source, block_size=BLOCK_SIZE, start=None, end=None):
+    """Scores each block as soon as its features are built. Yields (dates, predictions) per block."""
+    for rows, feats in feature_arrays(source, block_size, start, end):
+        X = np.column_stack([feats[c] for c in prediction.FEATURE_COLS]).astype(np.float64)
+        yield rows[:, 0].astype(np.int64).astype('datetime64[D]'), model.predict(X)
+
+def predict(model, source, block_size=BLOCK_SIZE, start=None, end=None):
+    """In-sample predictions for every feature row as a Date-indexed Series."""
+    parts = list(predict_blocks(model, source, block_size, start, end))
+    if not parts: return pd.Series(dtype=np.float64, name='Predicted')
+    dates, preds = zip(*parts)
+    return pd.Series(np.concatenate(preds), index=pd.DatetimeIndex(np.concatenate(dates).astype('datetime64[ns]'), name='Date'), name='Predicted')
+
+def predict_universe(model, tickers, block_size=BLOCK_SIZE, start=None, end=None):
+    """Latest prediction per ticker, streaming each ticker's history in turn."""
+    out = {}
+    for ticker in tickers:
+        last = None
+        for dates, preds in predict_blocks(model, ticker, block_size, start, end): last = (pd.Timestamp(dates[-1]), preds[-1])
+        if last is not None: out[ticker] = last
+    return out
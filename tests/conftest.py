@@ -0,0 +1,48 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import store
+
+@pytest.fixture
+def store_dir(tmp_path, monkeypatch):
+    """Points the OHLCV store at an empty per-test folder."""
+    path = str(tmp_path / "ohlcv")
+    monkeypatch.setattr(store, "STORE_DIR", path)
+    return path
+
+@pytest.fixture
+def fake_server():
+    """
+    Local HTTP server, configured per test by path:
+    routes {path: body}, latency {path: seconds}, failures {path: number of
+    503s before the route answers}; hits {path: requests} counts every GET.
+    """
+    routes, latency, failures, hits, lock = {}, {}, {}, {}, threading.Lock()
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                hits[self.path] = hits.get(self.path, 0) + 1
+                seen = hits[self.path]
+            time.sleep(latency.get(self.path, 0))
+            if self.path not in routes: return self.send_error(404)
+            if seen <= failures.get(self.path, 0): return self.send_error(503)
+            body = routes[self.path].encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *args): pass
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    httpd.routes, httpd.latency, httpd.failures, httpd.hits = routes, latency, failures, hits
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
@@ -0,0 +1,31 @@
+"""RidgeStats rank-one updates and downdates agree with a sklearn Ridge refit."""
+import numpy as np
+from sklearn.linear_model import Ridge
+
+import backtest
+
+def test_ridge_stats_update_and_downdate_match_refit():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 9)) * [1, 10, 100, 1, 5, 50, 1, 2, 3] + 20
+    y = X @ rng.normal(size=9) + rng.normal(size=400)
+    stats = backtest.RidgeStats(X[:100], y[:100], alpha=1.0)
+    # slide a 100-row window forward: add the next row, drop the oldest
+    for t in range(100, 400):
+        stats.add(X[t], y[t])
+        stats.remove(X[t - 100], y[t - 100])
+        if t % 50 == 0 or t == 399:
+            ref = Ridge(alpha=1.0).fit(X[t - 99:t + 1], y[t - 99:t + 1])
+            w, b = stats.coef()
+            assert np.allclose(w, ref.coef_, rtol=1e-7, atol=1e-9)
+            assert np.allclose(b, ref.intercept_, rtol=1e-7, atol=1e-9)
+
+def test_walk_forward_ridge_matches_refit_per_origin():
+    rng = np.random.default_rng(1)
+    X = np.cumsum(rng.normal(size=(300, 5)), axis=0)
+    y = X @ rng.normal(size=5) + rng.normal(size=300)
+    for window in ("expanding", "rolling"):
+        wf = backtest.walk_forward(Ridge(alpha=1.0), X, y, origins=60, window=window, train_size=120)
+        for t, pred in wf["predictions"]["Predicted"].items():
+            lo = 0 if window == "expanding" else t - 120
+            ref = Ridge(alpha=1.0).fit(X[lo:t], y[lo:t]).predict(X[t:t + 1])[0]
+            assert np.allclose(pred, ref, rtol=1e-9)
@@ -0,0 +1,70 @@
+"""Data_Import.py against fixture directories and a local fixture HTTP server."""
+import json
+import os
+
+import pytest
+
+import Data_Import
+import store
+
+GOOD = """Price,Close,High,Low,Open,Volume
+Ticker,{t},{t},{t},{t},{t}
+Date,,,,,
+2024-01-02,101.0,102.0,99.0,100.0,1000
+2024-01-03,103.0,104.0,100.5,101.0,1200
+2024-01-04,102.5,103.5,101.0,103.0,900
+"""
+# Close column missing entirely
+MALFORMED = """Price,High,Low,Open,Volume
+Ticker,{t},{t},{t},{t}
+Date,,,,
+2024-01-02,102.0,99.0,100.0,1000
+"""
+
+pytestmark = pytest.mark.usefixtures("store_dir")
+
+def test_directory_backend_commits_every_ticker(tmp_path):
+    (tmp_path / "AAA.NS.csv").write_text(GOOD.format(t="AAA.NS"))
+    (tmp_path / "BBB_stock_10yrs.csv").write_text(GOOD.format(t="BBB.NS"))
+    results = Data_Import.ingest(["AAA.NS", "BBB.NS"], Data_Import.backend_from_spec(f"dir:{tmp_path}"), start=None, backoff=0)
+    assert [r["committed"] for r in results] == [True, True]
+    assert [r["rows"] for r in results] == [3, 3]
+    assert store.read("BBB.NS")[:, 4].tolist() == [101.0, 103.0, 102.5]
+
+def test_http_backend_retries_transient_failures(fake_server):
+    fake_server.routes["/AAA.NS.csv"] = GOOD.format(t="AAA.NS")
+    fake_server.failures["/AAA.NS.csv"] = 2
+    [r] = Data_Import.ingest(["AAA.NS"], Data_Import.HTTPBackend(fake_server.url), start=None, retries=3, backoff=0)
+    assert r["error"] is None and r["committed"]
+    assert r["attempts"] == 3 and fake_server.hits["/AAA.NS.csv"] == 3
+    assert len(store.read("AAA.NS")) == 3
+
+def test_http_backend_gives_up_after_retries(fake_server):
+    fake_server.routes["/AAA.NS.csv"] = GOOD.format(t="AAA.NS")
+    fake_server.failures["/AAA.NS.csv"] = 5
+    [r] = Data_Import.ingest(["AAA.NS"], Data_Import.HTTPBackend(fake_server.url), start=None, retries=2, backoff=0)
+    assert r["attempts"] == 2 and "503" in r["error"]
+    assert store.read("AAA.NS") is None
+
+def test_validation_rejects_malformed_dump(tmp_path):
+    (tmp_path / "AAA.NS.csv").write_text(MALFORMED.format(t="AAA.NS"))
+    [r] = Data_Import.ingest(["AAA.NS"], Data_Import.DirectoryBackend(str(tmp_path)), start=None, retries=1, backoff=0)
+    assert "missing columns ['Close']" in r["error"]
+    assert not r["committed"] and store.read("AAA.NS") is None
+
+def test_partial_failure_commits_nothing(fake_server):
+    fake_server.routes["/AAA.NS.csv"] = GOOD.format(t="AAA.NS")
+    fake_server.routes["/BBB.NS.csv"] = MALFORMED.format(t="BBB.NS")
+    results = Data_Import.ingest(["AAA.NS", "BBB.NS"], Data_Import.HTTPBackend(fake_server.url), start=None, retries=1, backoff=0)
+    assert results[0]["error"] is None and results[1]["error"]
+    assert not any(r["committed"] for r in results)
+    assert store.read("AAA.NS") is None and store.read("BBB.NS") is None
+    with open(os.path.join(store.STORE_DIR, "manifest.json")) as f: manifest = json.load(f)
+    assert manifest["AAA.NS"]["committed"] is False and "missing columns" in manifest["BBB.NS"]["error"]
+
+def test_allow_partial_commits_the_successes(fake_server):
+    fake_server.routes["/AAA.NS.csv"] = GOOD.format(t="AAA.NS")
+    results = Data_Import.ingest(["AAA.NS", "BBB.NS"], Data_Import.HTTPBackend(fake_server.url), start=None, retries=1, backoff=0,
+                                 allow_partial=True)
+    assert [r["committed"] for r in results] == [True, False]
+    assert len(store.read("AAA.NS")) == 3 and store.read("BBB.NS") is None
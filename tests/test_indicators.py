@@ -0,0 +1,23 @@
+"""IndicatorEngine appends agree with the batch market.add_technical_indicators."""
+import os
+
+import numpy as np
+import pandas as pd
+
+import indicators
+import market
+import store
+
+PRICES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "DMART_stock_10yrs.csv")
+
+def test_appends_match_batch_indicators():
+    df = store.read_price_csv(PRICES)
+    batch = market.add_technical_indicators(df).dropna().reset_index(drop=True)
+    # cold start on the first 300 bars, then every later bar appended one at a time
+    engine, _ = indicators.IndicatorEngine.from_history(df.iloc[:300])
+    rows = engine.extend(df.iloc[300:])
+    expected = batch[batch['Date'] >= df['Date'].iloc[300]].reset_index(drop=True)
+    assert len(rows) == len(expected) > 1000
+    assert (rows['Date'].to_numpy() == expected['Date'].to_numpy()).all()
+    assert np.allclose(rows[indicators.INDICATOR_COLS].to_numpy(dtype=float), expected[indicators.INDICATOR_COLS].to_numpy(dtype=float),
+                       rtol=1e-9, atol=1e-8)
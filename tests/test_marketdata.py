@@ -0,0 +1,118 @@
+"""MarketDataClient over the real YahooSource/store path, with yf.Ticker replaced by a local fake HTTP server."""
+import asyncio
+import io
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+import marketdata
+import store
+
+SYMBOL = "FAKE.NS"
+HISTORY = """Date,Open,High,Low,Close,Volume
+2024-01-02,100.0,102.0,99.0,101.0,1000
+2024-01-03,101.0,104.0,100.5,103.0,1200
+2024-01-04,103.0,103.5,101.0,102.5,900
+"""
+
+# endpoint: (body, latency in seconds)
+ENDPOINTS = {
+    "history": (HISTORY, 0.3),
+    "info": (json.dumps({"longName": "Fake Ltd", "currentRatio": 1.5}), 0.2),
+    "news": (json.dumps([{"title": "fake headline"}]), 0.1),
+    "price": (json.dumps({"last_price": 102.75}), 0.0)
+}
+
+def path(endpoint):
+    return f"/{endpoint}/{SYMBOL}"
+
+@pytest.fixture
+def server(fake_server):
+    for endpoint, (body, latency) in ENDPOINTS.items():
+        fake_server.routes[path(endpoint)] = body
+        fake_server.latency[path(endpoint)] = latency
+    return fake_server
+
+class FakeTicker:
+    """The slice of yf.Ticker that YahooSource uses, served by the fake server."""
+    def __init__(self, base, symbol):
+        self.base, self.symbol = base, symbol
+
+    def _get(self, endpoint):
+        with urllib.request.urlopen(f"{self.base}/{endpoint}/{self.symbol}", timeout=5) as resp: return resp.read()
+
+    def history(self, start=None, period=None, interval="1d"):
+        hist = pd.read_csv(io.BytesIO(self._get("history")), index_col="Date", parse_dates=True)
+        hist.index = hist.index.tz_localize("Asia/Kolkata")
+        return hist
+
+    @property
+    def info(self): return json.loads(self._get("info"))
+
+    @property
+    def news(self): return json.loads(self._get("news"))
+
+    @property
+    def fast_info(self): return json.loads(self._get("price"))
+
+@pytest.fixture
+def make_client(server, store_dir):
+    clients = []
+    def make(**endpoints):
+        client = marketdata.MarketDataClient(marketdata.YahooSource(lambda s: FakeTicker(server.url, s)), endpoints=endpoints)
+        clients.append(client)
+        return client
+    yield make
+    for client in clients: client.close()
+
+def test_page_waits_for_the_slowest_endpoint(server, make_client):
+    client = make_client()
+    t0 = time.perf_counter()
+    df, info, news = client.page_sync(SYMBOL)
+    elapsed = time.perf_counter() - t0
+    assert max(server.latency[path(e)] for e in marketdata.PAGE) <= elapsed < sum(server.latency[path(e)] for e in marketdata.PAGE) - 0.1
+    assert df['Close'].tolist() == [101.0, 103.0, 102.5]
+    assert info["longName"] == "Fake Ltd" and news == "FAKE HEADLINE"
+    # history and info both wrote the ticker's meta file concurrently; neither update is lost
+    meta = store.read_meta(SYMBOL)
+    assert meta["info"]["longName"] == "Fake Ltd" and "synced_at" in meta
+
+def test_ttl_hit_makes_no_upstream_call(server, make_client):
+    client = make_client()
+    first = client.page_sync(SYMBOL)
+    calls, hits = client.upstream_calls, dict(server.hits)
+    t0 = time.perf_counter()
+    again = client.page_sync(SYMBOL)
+    assert time.perf_counter() - t0 < 0.05
+    assert client.upstream_calls == calls == len(marketdata.PAGE) and server.hits == hits
+    assert again[0] is first[0] and again[1:] == first[1:]
+
+def test_timeout_returns_fallback_and_late_result_fills_cache(server, make_client):
+    server.latency[path("news")] = 0.3
+    fallback = marketdata.ENDPOINTS["news"][2]
+    client = make_client(news=(0.05, 600, fallback))
+    t0 = time.perf_counter()
+    assert client.fetch_sync("news", SYMBOL) == fallback
+    assert time.perf_counter() - t0 < 0.25
+    deadline = time.monotonic() + 5
+    while client.caches["news"].get(SYMBOL) is None and time.monotonic() < deadline: time.sleep(0.02)
+    assert client.caches["news"].get(SYMBOL) == "FAKE HEADLINE"
+    assert client.fetch_sync("news", SYMBOL) == "FAKE HEADLINE"
+    assert client.upstream_calls == 1 and server.hits[path("news")] == 1
+
+def test_concurrent_fetches_share_one_upstream_call(server, make_client):
+    client = make_client()
+    async def burst(): return await asyncio.gather(*(client.fetch("info", SYMBOL) for _ in range(8)))
+    results = client.run(burst())
+    assert all(r["longName"] == "Fake Ltd" for r in results)
+    assert client.upstream_calls == 1 and server.hits[path("info")] == 1
+
+    server.latency[path("price")] = 0.2
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        prices = list(pool.map(lambda _: client.fetch_sync("price", SYMBOL), range(8)))
+    assert prices == [102.75] * 8
+    assert client.upstream_calls == 2 and server.hits[path("price")] == 1
@@ -0,0 +1,169 @@
+"""
+Per-ticker hyperparameter search for the forecast ensemble.
+
+    python tuning.py                 # every company in the universe
+    python tuning.py DMART.NS        # only some tickers
+
+Each model in prediction.MODEL_SPECS gets a random sample of its SEARCH_SPACE,
+narrowed by successive halving: every rung scores the survivors on
+TimeSeriesSplit folds over the most recent rows, keeps the best 1/ETA and
+gives them ETA times more history, until the last rung uses all of it. Losing
+configurations are therefore only ever fit on short histories, and
+GradientBoosting candidates stop adding trees once their validation loss
+stalls (n_iter_no_change); the winner is stored with the number of trees it
+actually needed. Winners go to a JSON store that prediction.model_specs()
+reads, so the next forecast for that ticker trains with them.
+"""
+import itertools
+import json
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+import cache
+import prediction
+
+TUNING_FILE = os.environ.get("RSA_TUNING_FILE", os.path.join(cache.CACHE_DIR, "tuning.json"))
+ETA = 3
+CANDIDATES = 12
+MIN_ROWS = 300
+SPLITS = 3
+MAX_BOOSTING_TREES = 1000
+
+SEARCH_SPACE = {
+    "Ridge Regression": {"alpha": [0.01, 0.1, 1.0, 10.0, 100.0]},
+    "Random Forest": {"n_estimators": [50, 100, 200, 300], "max_depth": [6, 10, 15, None],
+                      "min_samples_leaf": [1, 3, 5], "max_features": [1.0, 0.5, "sqrt"]},
+    "Gradient Boosting": {"learning_rate": [0.03, 0.05, 0.1], "max_depth": [2, 3, 4], "subsample": [1.0, 0.8],
+                          "min_samples_leaf": [1, 5, 10]},
+    "Hist Gradient Boosting": {"learning_rate": [0.03, 0.05, 0.1], "max_leaf_nodes": [7, 15, 31], "min_samples_leaf": [5, 20],
+                               "l2_regularization": [0.0, 1.0]},
+    "Compact Forest": {"n_estimators": [50, 100], "max_leaf_nodes": [64, 128, 256], "min_samples_leaf": [1, 2, 5],
+                       "max_features": [1.0, 0.5]}
+}
+# Search-only settings: boosting runs up to MAX_BOOSTING_TREES with early
+# stopping; (extra params, fitted stage count attribute, param to store it as)
+EARLY_STOPPING = {
+    "Gradient Boosting": ({"n_estimators": MAX_BOOSTING_TREES, "n_iter_no_change": 10, "validation_fraction": 0.1, "tol": 1e-4},
+                          "n_estimators_", "n_estimators"),
+    "Hist Gradient Boosting": ({"max_iter": MAX_BOOSTING_TREES, "early_stopping": True, "n_iter_no_change": 10, "validation_fraction": 0.1, "tol": 1e-4},
+                               "n_iter_", "max_iter")
+}
+
+_STORE = cache.LRUCache(maxsize=1)
+
+def sample_space(space, n, seed=42):
+    """Up to n distinct parameter dicts drawn from the grid (all of it if smaller)."""
+    keys = sorted(space)
+    grid = [dict(zip(keys, combo)) for combo in itertools.product(*(space[k] for k in keys))]
+    if len(grid) <= n: return grid
+    return [grid[i] for i in sorted(np.random.default_rng(seed).choice(len(grid), n, replace=False))]
+
+def _search_params(name, params):
+    base = dict(prediction.MODEL_BACKENDS[name][0][1])
+    base.update(params)
+    if name in EARLY_STOPPING: base.update(EARLY_STOPPING[name][0])
+    return base
+
+def _score(name, params, X, y, rows):
+    """Mean RMSE over TimeSeriesSplit folds of the last `rows` rows, plus the boosting stages used."""
+    from sklearn.model_selection import TimeSeriesSplit
+    cls = prediction.MODEL_BACKENDS[name][0][0]
+    X, y = X[-rows:], y[-rows:]
+    errors, stages = [], []
+    for train, test in TimeSeriesSplit(n_splits=SPLITS).split(X):
+        model = cls(**_search_params(name, params))
+        model.fit(X[train], y[train])
+        errors.append(np.sqrt(np.mean((model.predict(X[test]) - y[test]) ** 2)))
+        if name in EARLY_STOPPING: stages.append(getattr(model, EARLY_STOPPING[name][1]))
+    return float(np.mean(errors)), int(np.ceil(np.mean(stages))) if stages else None
+
+def successive_halving(name, X, y, n_candidates=CANDIDATES, n_jobs=None, backend=None, seed=42):
+    """
+    Best parameters for one model on (X, y). Returns {"params", "rmse",
+    "fits", "rungs"}; rungs lists (rows, candidates) per round.
+    """
+    n_jobs = prediction.N_JOBS if n_jobs is None else n_jobs
+    backend = backend or prediction.BACKEND
+    candidates = sample_space(SEARCH_SPACE[name], n_candidates, seed)
+    n_rungs = max(1, math.ceil(math.log(len(candidates), ETA))) if len(candidates) > 1 else 1
+    rungs, fits = [], 0
+    while True:
+        rows = len(X) if n_rungs == 1 else max(MIN_ROWS, len(X) // ETA ** (n_rungs - 1))
+        rows = min(rows, len(X))
+        scores = prediction._run([(_score, (name, p, X, y, rows)) for p in candidates], n_jobs, backend)
+        fits += len(candidates) * SPLITS
+        rungs.append((rows, len(candidates)))
+        order = np.argsort([s for s, _ in scores], kind="stable")
+        if n_rungs == 1 or len(candidates) == 1: break
+        keep = max(1, math.ceil(len(candidates) / ETA))
+        candidates = [candidates[i] for i in order[:keep]]
+        n_rungs -= 1
+
+    best = int(order[0])
+    rmse, stages = scores[best]
+    params = dict(candidates[best])
+    if stages is not None: params[EARLY_STOPPING[name][2]] = stages
+    return {"params": params, "rmse": rmse, "fits": fits, "rungs": rungs}
+
+def tune(df, n_jobs=None, backend=None, models=None):
+    """Searches every model in MODEL_SPECS (or `models`) on one price history."""
+    data = prediction.prepare_features(df)
+    X = data[prediction.FEATURE_COLS].to_numpy(dtype=np.float64)
+    y = data['Close'].to_numpy(dtype=np.float64)
+    out = {}
+    for name in models or prediction.MODEL_SPECS:
+        t0 = time.perf_counter()
+        out[name] = successive_halving(name, X, y, n_jobs=n_jobs, backend=backend)
+        out[name]["seconds"] = time.perf_counter() - t0
+    return out
+
+def _read(path):
+    try: key = cache.file_key(path)
+    except OSError: return {}
+    store = _STORE.get(key)
+    if store is None:
+        try:
+            with open(path) as f: store = json.load(f)
+        except (OSError, ValueError): store = {}
+        _STORE.put(key, store)
+    return store
+
+def load(ticker, path=None):
+    """{model name: tuned params} for a ticker, or {} if it was never tuned."""
+    entry = _read(path or TUNING_FILE).get(ticker)
+    return {name: r["params"] for name, r in entry["models"].items()} if entry else {}
+
+def save(ticker, df, results, path=None):
+    path = path or TUNING_FILE
+    store = dict(_read(path))
+    store[ticker] = {
+        "tuned_at": time.time(), "rows": len(df), "last_date": str(df['Date'].iloc[-1].date()),
+        "models": {name: {"params": r["params"], "rmse": r["rmse"], "fits": r["fits"]} for name, r in results.items()}
+    }
+    def write(tmp):
+        with open(tmp, 'w') as f: json.dump(store, f, indent=1)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    cache.atomic_write(path, write)
+
+def tune_ticker(ticker, df=None, n_jobs=None, path=None):
+    """Tunes and stores one ticker; the next forecast for it picks the winners up."""
+    import market
+    if df is None: df, _ = market.fetch_history_data(ticker)
+    if len(df) < 100: return {}
+    results = tune(df, n_jobs)
+    save(ticker, df, results, path)
+    return results
+
+if __name__ == "__main__":
+    import companies
+    jobs = int(os.environ.get("RSA_TUNING_JOBS", -1))
+    for ticker in sys.argv[1:] or companies.tickers():
+        t0 = time.perf_counter()
+        results = tune_ticker(ticker, n_jobs=jobs)
+        for name, r in results.items():
+            print(f"{ticker:<16}{name:<20}RMSE {r['rmse']:9.2f}  {r['fits']:4d} fits  {r['seconds']:6.1f}s  {r['params']}")
+        print(f"{ticker}: {time.perf_counter() - t0:.1f}s")
@@ -1,33 +1,91 @@
 import pandas as pd
+import numpy as np
+import instrument
 
-def generate_verdict(info, df_price, growth_data, efficiency_data):
+RATINGS = ["HOLD", "ACCUMULATE / BUY"]
+
+def score_signals(above_ma50, rev_growth, pe):
     """
-    Generates a generalized investment thesis in a precise pointers paragraph format.
+    One point each for price above its 50-day MA, revenue growth above 10%
+    and a P/E between 0 and 60. Works elementwise on NumPy arrays.
     """
-    # --- DATA EXTRACTION ---
-    curr_price = df_price['Close'].iloc[-1]
-    ma_50 = df_price['Close'].rolling(50).mean().iloc[-1]
-    pe = info.get('trailingPE', 0)
-    rev_growth = growth_data.get('Revenue', {}).get('pct', 0)
-    
-    # --- RATING LOGIC ---
-    score = 0
-    if curr_price > ma_50: score += 1
-    if rev_growth > 10: score += 1
-    if 0 < pe < 60: score += 1
-    
-    if score >= 2:
-        rating = "ACCUMULATE / BUY"
-        color = "#10b981" # Green
-        action_phrase = "considering accumulating positions on dips"
-    elif score >= 0:
-        rating = "HOLD"
-        color = "#eab308" # Yellow
-        action_phrase = "maintaining current exposure while awaiting clearer signals"
-    else:
-        rating = "REDUCE / SELL"
-        color = "#ef4444" # Red
-        action_phrase = "reducing exposure or waiting for a deeper correction"
+    pe = np.asarray(pe, dtype=np.float64)
+    return (np.asarray(above_ma50, dtype=bool).astype(np.int64)
+            + (np.asarray(rev_growth, dtype=np.float64) > 10)
+            + ((pe > 0) & (pe < 60)))
+
+def rating_for_score(score):
+    """Rating label per score (score >= 2 -> BUY, otherwise HOLD), elementwise."""
+    return np.where(np.asarray(score) >= 2, RATINGS[1], RATINGS[0])
+
+RATING_COLORS = {"ACCUMULATE / BUY": "#10b981", "HOLD": "#eab308", "REDUCE / SELL": "#ef4444"}
+ACTIONS = {
+    "ACCUMULATE / BUY": "considering accumulating positions on dips",
+    "HOLD": "maintaining current exposure while awaiting clearer signals",
+    "REDUCE / SELL": "reducing exposure or waiting for a deeper correction"
+}
+
+def moving_average(close, window=50):
+    """
+    Trailing mean along the first axis of a (dates x tickers) array, NaN
+    until `window` bars are available (or wherever the window holds a NaN).
+    """
+    close = np.asarray(close, dtype=np.float64)
+    out = np.full(close.shape, np.nan)
+    if len(close) >= window:
+        out[window - 1:] = np.lib.stride_tricks.sliding_window_view(close, window, axis=0).mean(axis=-1)
+    return out
+
+def _panel(value, like):
+    """Broadcasts a scalar, per-ticker vector or aligned (dates x tickers) frame to like's shape."""
+    if isinstance(value, pd.DataFrame): value = value.reindex(index=like.index, columns=like.columns)
+    elif isinstance(value, pd.Series): value = value.reindex(like.columns)
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), like.shape)
+
+def score_panel(close, rev_growth, pe, window=50):
+    """
+    Verdict scores for many tickers and dates in one pass.
+
+    close is a (dates x tickers) DataFrame; rev_growth and pe may each be a
+    scalar, a per-ticker Series/array or a DataFrame aligned with close.
+    Returns the (dates x tickers) score frame, NaN where there is no close;
+    the first window-1 bars of a ticker score no momentum point.
+    """
+    prices = close.to_numpy(dtype=np.float64)
+    with np.errstate(invalid='ignore'):
+        above = prices > moving_average(prices, window)
+    score = score_signals(above, _panel(rev_growth, close), _panel(pe, close)).astype(np.float64)
+    score[np.isnan(prices)] = np.nan
+    return pd.DataFrame(score, index=close.index, columns=close.columns)
+
+def rating_panel(scores):
+    """Rating labels for a score frame (None where the score is NaN)."""
+    values = scores.to_numpy(dtype=np.float64)
+    labels = np.where(np.isnan(values), None, rating_for_score(np.nan_to_num(values)).astype(object))
+    return pd.DataFrame(labels, index=scores.index, columns=scores.columns)
+
+def rating_flips(ratings):
+    """Every date on which a ticker's rating changed: Date, Ticker, From, To (gaps without a rating are skipped)."""
+    values = ratings.to_numpy()
+    changed = np.zeros(values.shape, dtype=bool)
+    changed[1:] = (values[1:] != values[:-1]) & pd.notna(values[1:]) & pd.notna(values[:-1])
+    rows, cols = np.nonzero(changed)
+    order = np.lexsort((rows, cols))
+    rows, cols = rows[order], cols[order]
+    return pd.DataFrame({
+        "Date": ratings.index[rows], "Ticker": ratings.columns[cols],
+        "From": values[rows - 1, cols], "To": values[rows, cols]
+    })
+
+def rate(curr_price, ma_50, rev_growth, pe):
+    """Score, rating and color for one ticker at one moment (no text)."""
+    score = int(score_signals(curr_price > ma_50, rev_growth, pe))
+    rating = "ACCUMULATE / BUY" if score >= 2 else ("HOLD" if score >= 0 else "REDUCE / SELL")
+    return {"Score": score, "Rating": rating, "Color": RATING_COLORS[rating]}
+
+def explain(rating, curr_price, ma_50, rev_growth, pe):
+    """The investment-thesis paragraph for the ticker on screen."""
+    action_phrase = ACTIONS[rating]
 
     # --- TEXT GENERATION (NO INDENTATION TO FIX SCROLLING) ---
     tech_status = 'above' if curr_price > ma_50 else 'below'
@@ -40,7 +98,7 @@ def generate_verdict(info, df_price, growth_data, efficiency_data):
     val_signal = 'balanced' if pe < 60 else 'already priced in'
 
     # Note: Strings are flush left to prevent Markdown code blocks
-    summary = f"""**Detailed Investment Analysis:**
+    return f"""**Detailed Investment Analysis:**
 
 * **Technical Momentum:** The stock is currently trading {tech_status} its key 50-day moving average, indicating {tech_signal}.
 * **Fundamental Trajectory:** Historical data shows a {fund_status} revenue trajectory with a growth of {rev_growth:.1f}%, reflecting the company's ability to {fund_signal}.
@@ -48,9 +106,25 @@ def generate_verdict(info, df_price, growth_data, efficiency_data):
 
 **Strategic Conclusion:** Based on the confluence of these factors, the overall recommendation is **{rating}**. Investors are advised to proceed by {action_phrase}, keeping a close watch on the efficiency metrics and broader market sentiment."""
 
+@instrument.timed()
+def generate_verdict(info, df_price, growth_data, efficiency_data):
+    """
+    Generates a generalized investment thesis in a precise pointers paragraph format.
+    """
+    # --- DATA EXTRACTION ---
+    closes = df_price['Close'].to_numpy(dtype=np.float64)
+    curr_price = closes[-1]
+    # Only the last 50-day mean is needed, not the whole rolling series
+    ma_50 = closes[-50:].mean() if len(closes) >= 50 else np.nan
+    pe = info.get('trailingPE', 0)
+    rev_growth = growth_data.get('Revenue', {}).get('pct', 0)
+    
+    # --- RATING LOGIC ---
+    verdict = rate(curr_price, ma_50, rev_growth, pe)
+
     return {
-        "Rating": rating,
-        "Color": color,
-        "Summary": summary,
+        "Rating": verdict["Rating"],
+        "Color": verdict["Color"],
+        "Summary": explain(verdict["Rating"], curr_price, ma_50, rev_growth, pe),
         "Signals": [] # Not used in new layout
-    }
\ No newline at end of file
+    }